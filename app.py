@@ -1,17 +1,45 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from openai import OpenAI
+import importlib
 import os
 from datetime import datetime
-from sklearn.linear_model import LinearRegression
 import numpy as np
 import time
-from PIL import Image
-import base64
+import random
+import re
+import math
+import heapq
+import bisect
+import unicodedata
+import hashlib
+import zlib
+import sqlite3
+import threading
+from collections import OrderedDict, defaultdict, deque, namedtuple
+from types import MappingProxyType
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# A module imported on first attribute access. The heavy libraries below are
+# only needed by some pages (scikit-learn alone takes over a second to
+# import), so a new worker's first render no longer pays for all of them.
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+    
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self._name), attr)
+
+pd = LazyModule("pandas")
+px = LazyModule("plotly.express")
+go = LazyModule("plotly.graph_objects")
+openai = LazyModule("openai")
+linear_model = LazyModule("sklearn.linear_model")
+sparse = LazyModule("scipy.sparse")
 
 # Page Configuration
 st.set_page_config(
@@ -157,8 +185,9 @@ local_css()
 def initialize_clients():
     # Hardcode your OpenAI API key directly in the code
     openai_api_key = ""  # <-- Replace this with your key.
+    # ...or provide it through the environment (e.g. for the startup benchmark)
+    openai_api_key = openai_api_key or os.environ.get("OPENAI_API_KEY", "")
     os.environ["OPENAI_API_KEY"] = openai_api_key
-    client = OpenAI(api_key=openai_api_key)
 
     # API endpoints and headers
     SOFASCORE_URL = "https://www.sofascore.com/api/v1/sport/football/events/live"
@@ -173,7 +202,7 @@ def initialize_clients():
     }
 
     return {
-        "openai_client": client,
+        "openai_api_key": openai_api_key,
         "sofascore_url": SOFASCORE_URL,
         "rapidapi_url": RAPIDAPI_URL,
         "rapidapi_key": RAPIDAPI_KEY,
@@ -181,64 +210,2148 @@ def initialize_clients():
         "news_api_params": NEWS_API_PARAMS
     }
 
-# Cache decorator for API calls to avoid repeated calls
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def fetch_data_from_sofascore(url):
-    try:
-        response = requests.get(url)
+# Per-endpoint HTTP settings: base URL (one connection pool per host),
+# (connect, read) timeouts in seconds, retry budget, backoff factor and pool size
+HTTP_ENDPOINTS = {
+    "sofascore": {
+        "base_url": "https://www.sofascore.com/",
+        "timeout": (3.05, 10),
+        "retries": 2,
+        "backoff": 0.5,
+        "pool_size": 10
+    },
+    "rapidapi": {
+        "base_url": "https://free-api.live-football-data.p.rapidapi.com/",
+        "timeout": (3.05, 15),
+        "retries": 2,
+        "backoff": 1.0,
+        "pool_size": 5
+    },
+    "newsapi": {
+        "base_url": "https://newsapi.org/",
+        "timeout": (3.05, 10),
+        "retries": 3,
+        "backoff": 0.5,
+        "pool_size": 5
+    }
+}
+
+# Retry policy with "full jitter": sleep a random time between 0 and the
+# exponential backoff so sessions retrying together don't hit the upstream in
+# sync. A Retry-After header is honoured up to retry_after_max seconds
+# (urllib3's own default cap is six hours). 429s are never retried here.
+class JitteredRetry(Retry):
+    RETRY_AFTER_STATUS_CODES = frozenset([503])
+    
+    def __init__(self, *args, retry_after_max=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retry_after_max = retry_after_max
+    
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.retry_after_max = self.retry_after_max
+        return retry
+    
+    def get_backoff_time(self):
+        return random.uniform(0, super().get_backoff_time())
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None or self.retry_after_max is None:
+            return retry_after
+        return min(retry_after, self.retry_after_max)
+
+# Shared HTTP client: one keep-alive Session with a pooled adapter mounted per
+# upstream host. requests' connection pools are thread-safe, so every session
+# and background thread of the server process can share it. 429s are not
+# retried here: fetch_json hands their Retry-After to the endpoint's token
+# bucket, so every upstream hit costs a token.
+class HttpClient:
+    def __init__(self, endpoints):
+        self.endpoints = endpoints
+        self.session = requests.Session()
+        for settings in endpoints.values():
+            retry = JitteredRetry(
+                total=settings["retries"],
+                connect=settings["retries"],
+                read=settings["retries"],
+                status=settings["retries"],
+                backoff_factor=settings["backoff"],
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+                respect_retry_after_header=True,
+                retry_after_max=settings["timeout"][1],
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=settings["pool_size"],
+                max_retries=retry
+            )
+            self.session.mount(settings["base_url"], adapter)
+    
+    def get(self, endpoint, url, **kwargs):
+        kwargs.setdefault("timeout", self.endpoints[endpoint]["timeout"])
+        return self.session.get(url, **kwargs)
+
+# Created once per server process (not per rerun) and shared by all sessions
+@st.cache_resource
+def get_http_client():
+    return HttpClient(HTTP_ENDPOINTS)
+
+# OpenAI transport: keep-alive pool (at least as large as the LLM concurrency
+# limit), (overall, connect) timeouts in seconds and the SDK's retry budget
+OPENAI_HTTP = {
+    "max_connections": 8,
+    "max_keepalive": 8,
+    "keepalive_expiry": 60,
+    "timeout": 60.0,
+    "connect_timeout": 5.0,
+    "retries": 2
+}
+
+# One OpenAI client per server process and API key. The SDK client is
+# thread-safe, so every session reuses its pooled connections instead of
+# opening new ones on each rerun. The pool limits and timeouts are built from
+# the SDK's own exports, whichever HTTP library it ships on.
+@st.cache_resource
+def get_openai_client(api_key):
+    http_client = openai.DefaultHttpxClient(
+        limits=type(openai.DEFAULT_CONNECTION_LIMITS)(
+            max_connections=OPENAI_HTTP["max_connections"],
+            max_keepalive_connections=OPENAI_HTTP["max_keepalive"],
+            keepalive_expiry=OPENAI_HTTP["keepalive_expiry"]
+        ),
+        timeout=openai.Timeout(OPENAI_HTTP["timeout"], connect=OPENAI_HTTP["connect_timeout"])
+    )
+    return openai.OpenAI(api_key=api_key, http_client=http_client, max_retries=OPENAI_HTTP["retries"])
+
+# Persistent cache tier: SQLite file next to the app, size cap, per-endpoint
+# TTLs (seconds) and how long expired entries are kept for offline/fallback use
+DISK_CACHE_PATH = os.environ.get(
+    "SCAISTAR_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".scaistar_cache.sqlite3")
+)
+DISK_CACHE_MAX_BYTES = 50 * 1024 * 1024
+DISK_CACHE_MAX_STALE = 7 * 24 * 3600
+DISK_CACHE_TTLS = {
+    "sofascore": 60,
+    "rapidapi": 600,
+    "newsapi": 1800
+}
+
+# SQLite-backed key/value store of upstream JSON responses that survives
+# restarts and deploys. Entries carry their own expiry; expired entries are
+# still served when explicitly allowed (offline mode, upstream failures)
+# until they are older than max_stale or evicted (least recently used first)
+# to keep the file under max_bytes.
+class DiskCache:
+    def __init__(self, path, max_bytes=DISK_CACHE_MAX_BYTES, max_stale=DISK_CACHE_MAX_STALE):
+        self.max_bytes = max_bytes
+        self.max_stale = max_stale
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+    
+    # Returns (value, stored_at), or None when missing or expired
+    def get_entry(self, key, allow_expired=False):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, stored_at, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_at, expires_at = row
+            if expires_at < now and not (allow_expired and expires_at + self.max_stale >= now):
+                return None
+            self.conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value), stored_at
+    
+    def get(self, key, allow_expired=False):
+        entry = self.get_entry(key, allow_expired)
+        return None if entry is None else entry[0]
+    
+    def put(self, key, value, ttl):
+        data = json.dumps(value, separators=(",", ":"))
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now + ttl, now)
+            )
+            self._evict(now)
+    
+    def _evict(self, now):
+        self.conn.execute("DELETE FROM entries WHERE expires_at < ?", (now - self.max_stale,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at"
+        ).fetchall():
+            self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            get_metrics().incr("disk_cache.evictions")
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+@st.cache_resource
+def get_disk_cache():
+    return DiskCache(DISK_CACHE_PATH)
+
+# Cache key of an upstream request (hashed so API keys in params/headers
+# are not stored in clear)
+def disk_cache_key(endpoint, url, params=None, headers=None):
+    raw = json.dumps([url, params or {}, headers or {}], sort_keys=True)
+    return f"{endpoint}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+# Token-bucket limits per keyed API: sustained requests per second, burst
+# size, daily quota (reset at UTC midnight) and the longest a call may queue
+# for a token before it is shed
+RATE_LIMITS = {
+    "rapidapi": {"rate": 5.0, "burst": 5, "daily": 500, "max_wait": 2.0},
+    "newsapi": {"rate": 1.0, "burst": 2, "daily": 100, "max_wait": 2.0}
+}
+
+class RateLimited(Exception):
+    pass
+
+# Thread-safe token bucket with a daily quota, shared by all sessions using
+# the same API key. Callers queue (without holding the lock) until a token is
+# available or their deadline passes.
+class TokenBucket:
+    def __init__(self, rate, burst, daily):
+        self.rate = rate
+        self.burst = burst
+        self.daily = daily
+        self.cond = threading.Condition()
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.day = time.strftime("%Y-%m-%d", time.gmtime())
+        self.used_today = 0
+        self.blocked_until = 0.0
+    
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        today = time.strftime("%Y-%m-%d", time.gmtime())
+        if today != self.day:
+            self.day = today
+            self.used_today = 0
+    
+    def acquire(self, max_wait):
+        deadline = time.monotonic() + max_wait
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.used_today >= self.daily:
+                    raise RateLimited("daily quota exhausted")
+                wait = max(self.blocked_until - now, 0)
+                if not wait and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.used_today += 1
+                    return
+                wait = wait or (1 - self.tokens) / self.rate
+                if now + wait > deadline:
+                    raise RateLimited("rate limit reached, request shed")
+                self.cond.wait(wait)
+    
+    # The upstream answered 429: stop issuing calls for retry_after seconds
+    def throttle(self, retry_after):
+        with self.cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+    
+    def status(self):
+        with self.cond:
+            self._refill(time.monotonic())
+            return {
+                "tokens": round(self.tokens, 2),
+                "used_today": self.used_today,
+                "daily_remaining": self.daily - self.used_today,
+                "throttled_for": round(max(self.blocked_until - time.monotonic(), 0), 1)
+            }
+
+# Process-wide registry of buckets keyed on (endpoint, API key)
+class RateLimiterRegistry:
+    def __init__(self, limits):
+        self.limits = limits
+        self.lock = threading.Lock()
+        self.buckets = {}
+    
+    def get(self, endpoint, api_key):
+        if endpoint not in self.limits:
+            return None
+        key = (endpoint, hashlib.sha1((api_key or "").encode("utf-8")).hexdigest()[:8])
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                limits = self.limits[endpoint]
+                bucket = self.buckets[key] = TokenBucket(limits["rate"], limits["burst"], limits["daily"])
+            return bucket
+    
+    def status(self):
+        with self.lock:
+            buckets = list(self.buckets.items())
+        return [{"API": endpoint, "Key": key_hash, **bucket.status()} for (endpoint, key_hash), bucket in buckets]
+
+@st.cache_resource
+def get_rate_limiters():
+    return RateLimiterRegistry(RATE_LIMITS)
+
+# Request coalescing: at most one in-flight call per key; concurrent callers
+# with the same key wait for the leader's result (or exception)
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+    
+    def do(self, key, fn):
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+        
+        metrics = get_metrics()
+        if not leader:
+            metrics.incr("single_flight.coalesced")
+            return future.result()
+        
+        metrics.incr("single_flight.leaders")
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            if not future.done():
+                future.set_exception(RuntimeError("Upstream request was interrupted"))
+
+@st.cache_resource
+def get_single_flight():
+    return SingleFlight()
+
+# GET an upstream JSON document through the disk tier: a fresh stored copy
+# is served without calling the upstream (so restarts start warm), identical
+# concurrent requests share one upstream call, new responses are written
+# back, and an expired copy is served if the upstream fails (unless
+# fallback=False). In offline mode any stored copy is preferred over the
+# network. Returns (payload, fetched_at), the wall-clock time the payload
+# was fetched from the upstream (for stored copies, when it was stored).
+def fetch_json(endpoint, url, headers=None, params=None, offline=False, fallback=True):
+    disk = get_disk_cache()
+    metrics = get_metrics()
+    key = disk_cache_key(endpoint, url, params, headers)
+    cached = disk.get_entry(key, allow_expired=offline)
+    if cached is not None:
+        metrics.incr("disk_cache.hits")
+        return cached
+    metrics.incr("disk_cache.misses")
+    
+    bucket = get_rate_limiters().get(
+        endpoint,
+        (headers or {}).get("X-RapidAPI-Key") or (params or {}).get("apiKey")
+    )
+    
+    def request():
+        if bucket is not None:
+            try:
+                bucket.acquire(RATE_LIMITS[endpoint]["max_wait"])
+            except RateLimited:
+                metrics.incr(f"rate_limit.{endpoint}_shed")
+                raise
+        response = get_http_client().get(endpoint, url, headers=headers, params=params)
+        if response.status_code == 429 and bucket is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            bucket.throttle(float(retry_after) if retry_after.isdigit() else 60)
         response.raise_for_status()
         return response.json()
-    except Exception as e:
-        st.warning(f"Error fetching SofaScore data: {e}")
-        return {"events": []}
+    
+    try:
+        payload = get_single_flight().do(key, request)
+    except Exception:
+        stale = disk.get_entry(key, allow_expired=True) if fallback else None
+        if stale is None:
+            raise
+        metrics.incr("disk_cache.fallbacks")
+        return stale
+    disk.put(key, payload, DISK_CACHE_TTLS[endpoint])
+    return payload, time.time()
 
-@st.cache_data(ttl=600)  # Cache for 10 minutes
-def fetch_player_data(url, headers, params):
+# Stale-while-revalidate windows per endpoint (seconds): (fresh, max-stale).
+# Values younger than "fresh" are served as is; older values up to
+# "max-stale" are served immediately while a background refresh runs.
+SWR_WINDOWS = {
+    "rapidapi": (600, 3600),
+    "newsapi": (1800, 6 * 3600)
+}
+
+# Seconds a failed load with nothing to fall back on is remembered, so reruns
+# during an outage don't each wait on the upstream's retries
+SWR_FAILURE_TTL = 30
+
+# Most entries kept in memory (every distinct player search is one); the
+# least recently used are evicted, and the disk tier still has them
+SWR_MAX_ENTRIES = 256
+
+SWREntry = namedtuple("SWREntry", ["value", "fetched_at", "error", "refreshing", "max_stale"])
+
+# In-memory stale-while-revalidate cache shared by all sessions. Loaders
+# return (value, fetched_at) and ages are measured from fetched_at (wall
+# clock), so a value loaded from the disk tier keeps the age it already has.
+# A failed refresh keeps the last good value and records the error on the entry.
+# Entries past their max-stale window and expired failures are dropped on
+# every insert, and at most max_entries are kept (least recently used first out).
+class SWRCache:
+    def __init__(self, max_entries=SWR_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.failures = {}
+    
+    def _prune(self):
+        now = time.time()
+        for key in [k for k, e in self.entries.items() if now - e.fetched_at >= e.max_stale and not e.refreshing]:
+            del self.entries[key]
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        now = time.monotonic()
+        for key in [k for k, (failed_at, _) in self.failures.items() if now - failed_at >= SWR_FAILURE_TTL]:
+            del self.failures[key]
+    
+    def _store(self, key, value, fetched_at, max_stale):
+        value = freeze(value)
+        with self.lock:
+            self.entries[key] = SWREntry(value, fetched_at, None, False, max_stale)
+            self.entries.move_to_end(key)
+            self.failures.pop(key, None)
+            self._prune()
+        return value
+    
+    def _fail(self, key, error):
+        get_metrics().incr("swr.refresh_errors")
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries[key] = entry._replace(error=str(error), refreshing=False)
+    
+    def _refresh(self, key, loader, max_stale):
+        try:
+            self._store(key, *loader(), max_stale)
+        except Exception as e:
+            self._fail(key, e)
+    
+    # Value for key, loading it synchronously only when there is none or it
+    # is older than max_stale. fallback() supplies a value (e.g. from the
+    # disk tier) when a synchronous load fails and nothing is cached.
+    def get(self, key, loader, fresh_for, max_stale, fallback=None):
+        metrics = get_metrics()
+        with self.lock:
+            entry = self.entries.get(key)
+            age = None if entry is None else time.time() - entry.fetched_at
+            if entry is not None and age < max_stale:
+                if age >= fresh_for and not entry.refreshing:
+                    self.entries[key] = entry._replace(refreshing=True)
+                    get_executor().submit(self._refresh, key, loader, max_stale)
+                self.entries.move_to_end(key)
+                metrics.incr("swr.fresh_hits" if age < fresh_for else "swr.stale_hits")
+                return entry.value
+            failure = self.failures.get(key)
+        
+        if entry is None and failure is not None and time.monotonic() - failure[0] < SWR_FAILURE_TTL:
+            error = RuntimeError(failure[1])
+        else:
+            metrics.incr("swr.misses")
+            try:
+                value, fetched_at = loader()
+            except Exception as e:
+                if entry is not None:
+                    self._fail(key, e)
+                    return entry.value
+                with self.lock:
+                    self.failures[key] = (time.monotonic(), str(e))
+                    self._prune()
+                error = e
+            else:
+                return self._store(key, value, fetched_at, max_stale)
+        
+        value = fallback() if fallback is not None else None
+        if value is None:
+            raise error
+        return freeze(value)
+    
+    def error(self, key):
+        entry = self.entries.get(key)
+        return None if entry is None else entry.error
+
+@st.cache_resource
+def get_swr_cache():
+    return SWRCache()
+
+# fetch_json through the stale-while-revalidate cache
+def fetch_json_swr(endpoint, url, headers=None, params=None, offline=False):
+    key = (disk_cache_key(endpoint, url, params, headers), offline)
+    swr = get_swr_cache()
+    fresh_for, max_stale = SWR_WINDOWS[endpoint]
+    
+    def load():
+        payload, fetched_at = fetch_json(endpoint, url, headers=headers, params=params, offline=offline, fallback=False)
+        # Offline, the saved copy is the data to serve however old it is:
+        # time it from the load so it isn't re-read from disk on every call
+        return payload, time.time() if offline else fetched_at
+    
+    value = swr.get(
+        key,
+        load,
+        fresh_for,
+        max_stale,
+        fallback=lambda: get_disk_cache().get(key[0], allow_expired=True)
+    )
+    return value, swr.error(key)
+
+# Whether this session asked to be served from the persistent cache
+def is_offline_mode():
+    return st.session_state.get("offline_mode", False)
+
+# Seconds between live feed refreshes, and how long the first session of a
+# new process waits for the first snapshot
+LIVE_POLL_INTERVAL = 15
+LIVE_FIRST_SNAPSHOT_WAIT = 5
+
+# Read-only view of a JSON payload: dicts become mappingproxies, lists tuples
+def freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+# Immutable live feed snapshot published by the poller; table is the
+# columnar form of payload["events"] (see build_live_table)
+LiveSnapshot = namedtuple("LiveSnapshot", ["version", "fetched_at", "payload", "error", "table"])
+
+# Event-level changes between two consecutive snapshots: added and changed
+# events, ids of removed events, and the subset of changed events whose
+# score moved (used for goal alerts)
+LiveDelta = namedtuple("LiveDelta", ["version", "added", "removed", "changed", "scored"])
+
+# Number of recent deltas kept for sessions catching up (e.g. goal alerts)
+LIVE_DELTA_HISTORY = 50
+
+# The parts of an event that consumers react to: score, minute and status
+def live_event_state(event, now):
+    return (
+        event.get("homeScore", {}).get("current"),
+        event.get("awayScore", {}).get("current"),
+        event.get("status", {}).get("code"),
+        event.get("status", {}).get("description"),
+        event_minute(event, now)
+    )
+
+# Diff engine: remembers the state of every event of the previous snapshot
+# and compares the next one by event id
+class LiveDiffer:
+    def __init__(self):
+        self.states = {}
+    
+    def diff(self, version, events, now):
+        states = {}
+        added = []
+        changed = []
+        scored = []
+        for event in events:
+            event_id = event.get("id")
+            state = live_event_state(event, now)
+            states[event_id] = state
+            previous = self.states.get(event_id)
+            if previous is None:
+                added.append(event)
+            elif previous != state:
+                changed.append(event)
+                if previous[:2] != state[:2]:
+                    scored.append(event)
+        removed = [event_id for event_id in self.states if event_id not in states]
+        self.states = states
+        return LiveDelta(version, tuple(added), tuple(removed), tuple(changed), tuple(scored))
+
+# SofaScore status types shown in the status filter; anything else
+# (postponed, cancelled, ...) is "Other"
+LIVE_STATUS_TYPES = {"inprogress": "Live", "notstarted": "Not Started", "finished": "Finished"}
+LIVE_STATUSES = ["Live", "Not Started", "Finished", "Other"]
+
+# Match cards rendered per Live Matches sub-tab
+LIVE_MAX_CARDS = 40
+
+# Columnar live-match table from rows of (id, home_team, away_team,
+# home_score, away_score, league, status, time, start). League, status and
+# team names are categoricals so filters compare small integer codes.
+def live_table_from_rows(rows):
+    table = pd.DataFrame(rows, columns=[
+        "id", "home_team", "away_team", "home_score", "away_score", "league", "status", "time", "start"
+    ])
+    table["home_score"] = table["home_score"].fillna(0).astype("int16")
+    table["away_score"] = table["away_score"].fillna(0).astype("int16")
+    for column in ["home_team", "away_team", "league"]:
+        table[column] = table[column].fillna("").astype("category")
+    table["status"] = pd.Categorical(table["status"], categories=LIVE_STATUSES)
+    table["start"] = pd.to_datetime(table["start"], unit="s", utc=True)
+    return table
+
+# Normalize SofaScore events into the live-match table. Done once per feed
+# refresh by the poller; the filters on the Live Matches page are then
+# vectorized masks over this table.
+def build_live_table(events, now=None):
+    now = time.time() if now is None else now
+    rows = []
+    for event in events:
+        status = event.get("status", {})
+        status_name = LIVE_STATUS_TYPES.get(status.get("type"), "Other")
+        minute = event_minute(event, now)
+        if status.get("code") == 31:
+            label = "HT"
+        elif status_name == "Live":
+            label = f"Live - {minute}'" if minute else "Live"
+        elif status_name == "Finished":
+            label = "FT"
+        elif status_name == "Not Started" and event.get("startTimestamp"):
+            label = time.strftime("%H:%M", time.gmtime(event["startTimestamp"]))
+        else:
+            label = status.get("description", "")
+        rows.append((
+            event.get("id"),
+            event.get("homeTeam", {}).get("name"),
+            event.get("awayTeam", {}).get("name"),
+            event.get("homeScore", {}).get("current"),
+            event.get("awayScore", {}).get("current"),
+            event.get("tournament", {}).get("name"),
+            status_name,
+            label,
+            event.get("startTimestamp")
+        ))
+    return live_table_from_rows(rows)
+
+# Background poller: one thread per server process refreshes the live feed
+# every interval and publishes a new immutable snapshot. Sessions only read
+# the latest snapshot, so rendering never waits on SofaScore.
+class LiveFeedPoller:
+    def __init__(self, url, interval=LIVE_POLL_INTERVAL):
+        self.url = url
+        self.interval = interval
+        self.disk_key = disk_cache_key("sofascore", url)
+        self.snapshot = LiveSnapshot(0, None, freeze({"events": []}), None, build_live_table(()))
+        self.differ = LiveDiffer()
+        self.deltas = deque(maxlen=LIVE_DELTA_HISTORY)
+        self.lock = threading.Lock()
+        self.first_snapshot = threading.Event()
+        
+        # Start warm from the last feed persisted by a previous process
+        stored = get_disk_cache().get_entry(self.disk_key, allow_expired=True)
+        if stored is not None:
+            payload, stored_at = stored
+            self.differ.diff(1, payload.get("events", []), stored_at)
+            self.snapshot = LiveSnapshot(1, stored_at, freeze(payload), None, build_live_table(payload.get("events", []), stored_at))
+        
+        self.thread = threading.Thread(target=self._run, name="scaistar-live-poller", daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            self.refresh()
+            self.first_snapshot.set()
+            time.sleep(max(self.interval - (time.monotonic() - started), 0))
+    
+    def refresh(self):
+        metrics = get_metrics()
+        started = time.perf_counter()
+        try:
+            response = get_http_client().get("sofascore", self.url)
+            response.raise_for_status()
+            raw = response.json()
+            get_disk_cache().put(self.disk_key, raw, DISK_CACHE_TTLS["sofascore"])
+            payload = freeze(raw)
+        except Exception as e:
+            # Keep serving the last good payload and record the error
+            metrics.incr("live_poller.errors")
+            self.snapshot = self.snapshot._replace(error=str(e))
+            return
+        metrics.observe("live_poller.refresh_ms", round((time.perf_counter() - started) * 1000, 1))
+        fetched_at = time.time()
+        version = self.snapshot.version + 1
+        delta = self.differ.diff(version, payload.get("events", ()), fetched_at)
+        metrics.observe("live_poller.changed_events", len(delta.added) + len(delta.removed) + len(delta.changed))
+        table_started = time.perf_counter()
+        table = build_live_table(payload.get("events", ()), fetched_at)
+        metrics.observe("live_poller.table_ms", round((time.perf_counter() - table_started) * 1000, 1))
+        
+        with self.lock:
+            # Publishing is a single attribute assignment, so readers always
+            # see a complete snapshot
+            self.snapshot = LiveSnapshot(version, fetched_at, payload, None, table)
+            if delta.added or delta.removed or delta.changed:
+                self.deltas.append(delta)
+    
+    def latest(self):
+        return self.snapshot
+    
+    # Deltas published after the given version (oldest first)
+    def deltas_since(self, version):
+        return [delta for delta in list(self.deltas) if delta.version > version]
+
+@st.cache_resource
+def get_live_poller(url):
+    poller = LiveFeedPoller(url)
+    poller.first_snapshot.wait(LIVE_FIRST_SNAPSHOT_WAIT)
+    return poller
+
+# Warnings and captions raised while loading data. Loaders running on a pool
+# thread (see gather_context) collect them instead, and the session's script
+# thread renders them, so a worker never writes into a page (or a run that
+# has already finished).
+_notices = threading.local()
+
+def show_notice(kind, text):
+    collected = getattr(_notices, "collected", None)
+    if collected is not None:
+        collected.append((kind, text))
+    elif kind == "warning":
+        st.warning(text)
+    else:
+        st.caption(text)
+
+# Live feed: served from the shared poller's latest snapshot, or from the
+# persistent cache in offline mode
+def fetch_data_from_sofascore(url, offline=False):
+    poller = get_live_poller(url)
+    if offline:
+        stored = get_disk_cache().get(poller.disk_key, allow_expired=True)
+        if stored is not None:
+            return freeze(stored)
+    snapshot = poller.latest()
+    if snapshot.error:
+        show_notice("warning", f"Error fetching SofaScore data: {snapshot.error}")
+    return snapshot.payload
+
+# Stale-while-revalidate caching for API calls (see SWR_WINDOWS)
+def fetch_player_data(url, headers, params, offline=False):
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
+        data, error = fetch_json_swr("rapidapi", url, headers=headers, params=params, offline=offline)
     except Exception as e:
-        st.warning(f"Error fetching player data: {e}")
+        show_notice("warning", f"Error fetching player data: {e}")
         return {}
+    if error:
+        show_notice("caption", f"Showing saved player data (last refresh failed: {error})")
+    return data
 
-@st.cache_data(ttl=1800)  # Cache for 30 minutes
-def fetch_sports_news(url, params):
+def fetch_sports_news(url, params, offline=False):
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+        data, error = fetch_json_swr("newsapi", url, params=params, offline=offline)
     except Exception as e:
-        st.warning(f"Error fetching sports news: {e}")
+        show_notice("warning", f"Error fetching sports news: {e}")
         return {"articles": []}
+    if error:
+        show_notice("caption", f"Showing saved news (last refresh failed: {error})")
+    return data
 
-# Function to process the user's question using OpenAI
-def get_ai_response(client, question, context_data):
+# Process-wide performance metrics: counters plus a rolling window of samples
+# (latencies, sizes) per metric name, summarized on the Settings page
+class Metrics:
+    def __init__(self, window=500):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(int)
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+    
+    def incr(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+    
+    def observe(self, name, value):
+        with self.lock:
+            self.samples[name].append(value)
+    
+    def summary(self):
+        with self.lock:
+            rows = [{"Metric": name, "Count": value, "Last": None, "p50": None, "p95": None}
+                    for name, value in self.counters.items()]
+            for name, values in self.samples.items():
+                if values:
+                    ordered = sorted(values)
+                    rows.append({
+                        "Metric": name,
+                        "Count": len(ordered),
+                        "Last": values[-1],
+                        "p50": ordered[len(ordered) // 2],
+                        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+                    })
+        return sorted(rows, key=lambda row: row["Metric"])
+
+@st.cache_resource
+def get_metrics():
+    return Metrics()
+
+# Shared worker pool for background work (SWR refreshes, pre-warms, memory folds)
+@st.cache_resource
+def get_executor():
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="scaistar")
+
+# Worker pool for the chat context fan-out, kept apart from the background
+# pool so slow refreshes and pre-warms can't hold its sources past their deadlines
+@st.cache_resource
+def get_context_executor():
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="scaistar-context")
+
+# Last successful value of every context source, served when a source misses
+# its deadline or fails
+@st.cache_resource
+def get_last_good_context():
+    return {"lock": threading.Lock(), "values": {}}
+
+# Per-source deadlines (seconds) for the chat context fan-out
+CONTEXT_DEADLINES = {
+    "live_matches": 3.0,
+    "sports_news": 3.0
+}
+
+def _run_context_source(name, loader):
+    # Collect the loader's warnings for the script thread to render
+    _notices.collected = notices = []
+    started = time.perf_counter()
     try:
-        prompt = f"""
-        You are an expert sports analyst. Answer the following question
-        based on the provided live sports data. Be concise, informative, and engaging.
+        value = loader()
+    finally:
+        _notices.collected = None
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    store = get_last_good_context()
+    with store["lock"]:
+        store["values"][name] = value
+    get_metrics().observe(f"context.{name}_ms", round(elapsed_ms, 1))
+    return value, elapsed_ms, notices
+
+# Fetch all context sources concurrently. Each source gets its own deadline
+# measured from the start of the fan-out; a source that misses it (or fails)
+# is served from its last good value, or dropped if there is none. Returns
+# the context dict and a per-source report of status and elapsed time.
+# Warnings of sources that made their deadline are rendered here.
+def gather_context(sources, deadlines=CONTEXT_DEADLINES, default_deadline=3.0):
+    executor = get_context_executor()
+    started = time.perf_counter()
+    futures = {
+        name: executor.submit(_run_context_source, name, loader)
+        for name, loader in sources.items()
+    }
+    
+    context = {}
+    report = {}
+    for name in sorted(sources, key=lambda n: deadlines.get(n, default_deadline)):
+        remaining = deadlines.get(name, default_deadline) - (time.perf_counter() - started)
+        try:
+            context[name], elapsed_ms, notices = futures[name].result(timeout=max(remaining, 0))
+            for kind, text in notices:
+                show_notice(kind, text)
+            report[name] = {"status": "ok", "ms": elapsed_ms}
+            continue
+        except FutureTimeoutError:
+            status = "timeout"
+        except Exception:
+            status = "error"
+        
+        get_metrics().incr(f"context.{name}_{status}")
+        store = get_last_good_context()
+        with store["lock"]:
+            stale = store["values"].get(name)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if stale is not None:
+            context[name] = stale
+            report[name] = {"status": f"{status}, stale", "ms": elapsed_ms}
+        else:
+            report[name] = {"status": f"{status}, dropped", "ms": elapsed_ms}
+    
+    return context, report
+
+# Format a gather_context report as a one-line caption
+def format_context_report(report):
+    return " · ".join(
+        f"{name.replace('_', ' ')}: {info['ms']:.0f} ms ({info['status']})"
+        for name, info in report.items()
+    )
 
-        Today's date: {datetime.now().strftime('%Y-%m-%d')}
+# Number of events/articles retrieved for each chat question
+RETRIEVAL_TOP_EVENTS = 15
+RETRIEVAL_TOP_ARTICLES = 5
 
-        User question: {question}
+TOKEN_PATTERN = re.compile(r"\w+")
+STOPWORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "how", "i", "in", "is", "it", "me", "of", "on", "or", "s", "show", "that",
+    "the", "this", "to", "was", "what", "when", "where", "which", "who", "will",
+    "with", "you", "about", "tell", "today", "vs"
+])
 
-        Available context data:
-        {json.dumps(context_data, indent=2)}
-        """
+def tokenize(text):
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an expert sports analyst specializing in football."},
-                {"role": "user", "content": prompt}
-            ],
+# In-memory BM25 index over short documents. Documents are keyed (event id,
+# article URL) and carry a fingerprint, so sync() only re-tokenizes documents
+# that are new or changed and drops the ones that disappeared. Every document
+# has a row number; each term's postings are kept as NumPy arrays of rows and
+# term frequencies, patched once per term for each batch of changes, so
+# scoring a query is a few vectorized operations even right after a change.
+class RetrievalIndex:
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.lock = threading.RLock()
+        self.docs = {}
+        self.rows = {}
+        self.row_keys = []
+        self.free_rows = []
+        self.lengths = np.zeros(64)
+        self.postings = {}
+        self.total_length = 0
+        self.source = None
+    
+    # changes: (postings to add, terms losing postings, freed rows) of a
+    # batch, applied by _patch
+    def _remove(self, changes, key):
+        _, _, terms, length = self.docs.pop(key)
+        row = self.rows.pop(key)
+        changes[1].update(terms)
+        self.row_keys[row] = None
+        changes[2].append(row)
+        self.total_length -= length
+    
+    def _add(self, changes, key, fingerprint, item, text):
+        tokens = tokenize(text)
+        terms = defaultdict(int)
+        for token in tokens:
+            terms[token] += 1
+        if self.free_rows:
+            row = self.free_rows.pop()
+            self.row_keys[row] = key
+        else:
+            row = len(self.row_keys)
+            self.row_keys.append(key)
+            if row == len(self.lengths):
+                self.lengths = np.concatenate([self.lengths, np.zeros(row)])
+        self.rows[key] = row
+        self.lengths[row] = len(tokens)
+        for term, tf in terms.items():
+            changes[0][term].append((row, tf))
+        self.docs[key] = (fingerprint, item, tuple(terms), len(tokens))
+        self.total_length += len(tokens)
+    
+    def _upsert(self, changes, key, fingerprint, item, text):
+        current = self.docs.get(key)
+        if current is not None and current[0] == fingerprint:
+            # Same indexed text: just point at the newer item
+            self.docs[key] = (fingerprint, item) + current[2:]
+            return False
+        if current is not None:
+            self._remove(changes, key)
+        self._add(changes, key, fingerprint, item, text)
+        return True
+    
+    def _patch(self, changes):
+        added, dropped, freed = changes
+        alive = np.ones(len(self.row_keys), dtype=bool)
+        alive[freed] = False
+        for term in dropped:
+            # A term can be dropped before its first postings were patched in
+            posting = self.postings.get(term)
+            if posting is not None:
+                keep = alive[posting[0]]
+                self.postings[term] = (posting[0][keep], posting[1][keep])
+        for term, pairs in added.items():
+            # ...and a document can be added and removed within one batch
+            pairs = [(row, tf) for row, tf in pairs if alive[row]]
+            if not pairs:
+                continue
+            rows = np.array([row for row, _ in pairs])
+            tfs = np.array([tf for _, tf in pairs], dtype=float)
+            posting = self.postings.get(term)
+            if posting is not None:
+                rows = np.concatenate([posting[0], rows])
+                tfs = np.concatenate([posting[1], tfs])
+            self.postings[term] = (rows, tfs)
+        for term in dropped:
+            posting = self.postings.get(term)
+            if posting is not None and not len(posting[0]):
+                del self.postings[term]
+        # Freed rows are reused from the next batch on
+        self.free_rows.extend(freed)
+    
+    # Apply a delta. entries: iterable of (key, fingerprint, item, text); of
+    # entries sharing a key (e.g. syndicated articles with one URL) the last wins
+    def apply(self, entries, removed=()):
+        with self.lock:
+            self.source = None
+            changes = (defaultdict(list), set(), [])
+            entries = {entry[0]: entry for entry in entries}.values()
+            changed = sum(self._upsert(changes, *entry) for entry in entries)
+            for key in removed:
+                if key in self.docs:
+                    self._remove(changes, key)
+                    changed += 1
+            self._patch(changes)
+            return changed
+    
+    # Make the index hold exactly the given entries. source is the (immutable)
+    # payload they were built from: syncing the same payload again is free.
+    def sync(self, entries, source=None):
+        with self.lock:
+            if source is not None and source is self.source:
+                return 0
+            entries = list(entries)
+            seen = {entry[0] for entry in entries}
+            changed = self.apply(entries, [k for k in self.docs if k not in seen])
+            self.source = source
+            return changed
+    
+    # Top-k items by BM25 score; falls back to the first k documents when no
+    # query term matches (e.g. "what's happening right now?")
+    def search(self, query, k):
+        with self.lock:
+            matched = [self.postings[term] for term in set(tokenize(query)) if term in self.postings]
+            if not matched:
+                return [doc[1] for doc in list(self.docs.values())[:k]]
+            n_docs = len(self.docs)
+            avg_length = self.total_length / n_docs or 1
+            scores = np.zeros(len(self.row_keys))
+            for rows, tfs in matched:
+                idf = math.log(1 + (n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[rows] / avg_length)
+                scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+            candidates = np.flatnonzero(scores)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            best = candidates[np.lexsort((candidates, -scores[candidates]))]
+            return [self.docs[self.row_keys[row]][1] for row in best]
+    
+    # sync() then search() under one lock, so another session syncing a
+    # different payload (e.g. offline data) can't slip in between
+    def sync_search(self, entries, source, query, k):
+        with self.lock:
+            self.sync(entries, source)
+            return self.search(query, k)
+
+# One index per context source, shared by all sessions of the process
+@st.cache_resource
+def get_retrieval_indexes():
+    return {"live_matches": RetrievalIndex(), "sports_news": RetrievalIndex()}
+
+def _event_index_entries(events):
+    for event in events:
+        text = " ".join(filter(None, [
+            event.get("homeTeam", {}).get("name"),
+            event.get("awayTeam", {}).get("name"),
+            event.get("tournament", {}).get("name"),
+            event.get("tournament", {}).get("category", {}).get("name")
+        ]))
+        fingerprint = (
+            text,
+            event.get("homeScore", {}).get("current"),
+            event.get("awayScore", {}).get("current"),
+            event.get("status", {}).get("description")
+        )
+        yield event.get("id"), fingerprint, event, text
+
+def _article_index_entries(articles):
+    for article in articles:
+        text = f"{article.get('title') or ''} {article.get('description') or ''}"
+        key = article.get("url") or article.get("title")
+        yield key, text, article, text
+
+# Replace the raw context sources with the items most relevant to the question.
+# Both indexes are synced with the payloads passed in (live, offline or
+# sample data alike); only new or changed documents are re-indexed.
+def select_relevant_context(question, context_data):
+    indexes = get_retrieval_indexes()
+    started = time.perf_counter()
+    selected = dict(context_data)
+    if "live_matches" in context_data:
+        payload = context_data["live_matches"] or {}
+        index = indexes["live_matches"]
+        selected["live_matches"] = {"events": index.sync_search(
+            _event_index_entries(payload.get("events", [])), payload, question, RETRIEVAL_TOP_EVENTS
+        )}
+    if "sports_news" in context_data:
+        articles = context_data["sports_news"] or []
+        index = indexes["sports_news"]
+        selected["sports_news"] = index.sync_search(
+            _article_index_entries(articles), articles, question, RETRIEVAL_TOP_ARTICLES
         )
+    get_metrics().observe("retrieval.select_ms", round((time.perf_counter() - started) * 1000, 3))
+    return selected
+
+# Token budget for the context section of the prompt, and the share of it
+# reserved for live events (unused event budget is passed on to news)
+CONTEXT_TOKEN_BUDGET = 1500
+CONTEXT_EVENT_SHARE = 0.6
+
+# Rough token estimate (~4 characters per token for English/JSON text)
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+def compact_json(data):
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+# Current match minute of a live SofaScore event, or None if not in play
+def event_minute(event, now=None):
+    if event.get("status", {}).get("type") != "inprogress":
+        return None
+    period = event.get("time", {})
+    period_start = period.get("currentPeriodStartTimestamp")
+    if not period_start:
+        return None
+    now = time.time() if now is None else now
+    return max(int(now - period_start) // 60, 0) + period.get("initial", 0) // 60 + 1
+
+# Project a SofaScore event down to the fields the model needs
+def project_event(event):
+    return {
+        "home": event.get("homeTeam", {}).get("name"),
+        "away": event.get("awayTeam", {}).get("name"),
+        "score": f"{event.get('homeScore', {}).get('current', 0)}-{event.get('awayScore', {}).get('current', 0)}",
+        "minute": event_minute(event),
+        "tournament": event.get("tournament", {}).get("name"),
+        "status": event.get("status", {}).get("description")
+    }
+
+# Project a NewsAPI article down to the fields the model needs
+def project_article(article):
+    return {
+        "title": article.get("title"),
+        "source": (article.get("source") or {}).get("name"),
+        "date": (article.get("publishedAt") or "")[:10]
+    }
+
+# Keep the longest prefix of items whose serialized size fits the budget, so
+# the same payload always truncates to the same context
+def fit_to_budget(items, budget):
+    kept = []
+    used = 0
+    for item in items:
+        cost = estimate_tokens(compact_json(item)) + 1
+        if used + cost > budget:
+            break
+        kept.append(item)
+        used += cost
+    return kept, used
+
+# Build the compact prompt context from the raw context sources: projected
+# events and articles, serialized without whitespace and cut to the token
+# budget. Returns the context text and statistics: sizes, and the snapshot id
+# the answer cache keys on.
+def build_compact_context(context_data, token_budget=CONTEXT_TOKEN_BUDGET):
+    events = [project_event(e) for e in (context_data.get("live_matches") or {}).get("events", [])]
+    articles = [project_article(a) for a in context_data.get("sports_news") or []]
+    
+    kept_events, used = fit_to_budget(events, int(token_budget * CONTEXT_EVENT_SHARE))
+    kept_articles, _ = fit_to_budget(articles, token_budget - used)
+    
+    compact = {"live_matches": kept_events, "news": kept_articles}
+    omitted = {
+        "live_matches": len(events) - len(kept_events),
+        "news": len(articles) - len(kept_articles)
+    }
+    if any(omitted.values()):
+        compact["omitted"] = omitted
+    text = compact_json(compact)
+    # Match minutes move on every minute of live play while the answer stays
+    # valid, so only the rest of the context identifies the snapshot
+    stable = dict(compact, live_matches=[
+        {field: value for field, value in event.items() if field != "minute"} for event in kept_events
+    ])
+    
+    stats = {
+        "snapshot": context_snapshot_id(compact_json(stable)),
+        "context_tokens": estimate_tokens(text),
+        "events": f"{len(kept_events)}/{len(events)}",
+        "articles": f"{len(kept_articles)}/{len(articles)}"
+    }
+    return text, stats
+
+# Build the chat messages sent to OpenAI for a question and its compact
+# context, after the summary of the earlier conversation and the recent turns
+def build_ai_messages(question, context_text, summary="", history=()):
+    prompt = f"""
+    You are an expert sports analyst. Answer the following question
+    based on the provided live sports data. Be concise, informative, and engaging.
+
+    Today's date: {datetime.now().strftime('%Y-%m-%d')}
+
+    User question: {question}
+
+    Available context data (JSON):
+    {context_text}
+    """
+    messages = [{"role": "system", "content": "You are an expert sports analyst specializing in football."}]
+    if summary:
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+    messages.extend({"role": m["role"], "content": m["content"]} for m in history)
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+# Estimated prompt size of a list of chat messages
+def estimate_prompt_tokens(messages):
+    return sum(estimate_tokens(m["content"]) + 4 for m in messages)
+
+# Token budget for the earlier conversation in a chat prompt (recent turns
+# plus the summary), the size of the summary, and how far below the budget
+# the recent turns are cut when it overflows. Folding down to 40% of 2000
+# tokens leaves room for two or three typical answers (~400-500 tokens each)
+# before the next fold.
+HISTORY_TOKEN_BUDGET = 2000
+HISTORY_SUMMARY_TOKENS = 250
+HISTORY_FOLD_TARGET = 0.4
+
+# Fold turns that aged out of the prompt into the running summary with the
+# model; falls back to listing the earlier questions if the call fails
+def summarize_conversation(client, summary, turns, session, token_budget=HISTORY_SUMMARY_TOKENS):
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in turns)
+    prompt = f"""
+    Update the running summary of a football chat between a user and an assistant
+    with the new turns below. Keep the teams, players, matches and preferences the
+    user mentioned and the main facts and conclusions of the answers.
+    Reply with the summary only, in at most {token_budget * 3 // 4} words.
+
+    Current summary: {summary or "(none)"}
+
+    New turns:
+    {transcript}
+    """
+    started = time.perf_counter()
+    try:
+        with get_llm_limiter().slot(session):
+            response = client.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=token_budget,
+            )
+        get_metrics().observe("memory.summary_ms", round((time.perf_counter() - started) * 1000, 1))
+        return response.choices[0].message.content.strip()
+    except Exception:
+        get_metrics().incr("memory.summary_errors")
+        questions = "; ".join(m["content"] for m in turns if m["role"] == "user")
+        text = f"{summary} Earlier questions: {questions}".strip()
+        return text[-token_budget * 4:]
+
+# Chat history as sent to the model: the most recent turns verbatim and the
+# older ones folded into a running summary, together within a token budget.
+# The summary is kept between reruns (one memory per session). Folding runs
+# in the background after an answer has been shown, so a question never
+# waits on it; the next question reads the updated summary.
+class ConversationMemory:
+    def __init__(self, token_budget=HISTORY_TOKEN_BUDGET, fold_target=HISTORY_FOLD_TARGET):
+        self.token_budget = token_budget
+        self.fold_target = fold_target
+        self.lock = threading.Lock()
+        self.summary = ""
+        self.folded = 0
+        self.folding = False
+        self.generation = 0
+    
+    # Unfolded messages of a history (caller holds the lock)
+    def _unfolded(self, messages):
+        if self.folded > len(messages):
+            # The chat was cleared
+            self.summary = ""
+            self.folded = 0
+            self.generation += 1
+        return messages[self.folded:]
+    
+    # Summary and verbatim turns for a history (messages before the new
+    # question). If a fold is still pending, the oldest unfolded turns that
+    # don't fit the budget are left out until it lands.
+    def window(self, messages):
+        with self.lock:
+            summary = self.summary
+            recent = self._unfolded(messages)
+        costs = [message_tokens(m) for m in recent]
+        remaining = sum(costs)
+        start = 0
+        while start < len(recent) and estimate_tokens(summary) + remaining > self.token_budget:
+            remaining -= costs[start]
+            start += 1
+        return summary, recent[start:]
+    
+    # After an answer: when the history outgrew the budget, fold its oldest
+    # turns (ending on an answer) into the summary on the executor until the
+    # rest fits well under it. summarize(summary, turns) returns the new summary.
+    def fold_later(self, messages, summarize):
+        with self.lock:
+            recent = self._unfolded(messages)
+            costs = [message_tokens(m) for m in recent]
+            if self.folding or estimate_tokens(self.summary) + sum(costs) <= self.token_budget:
+                return False
+            target = self.token_budget * self.fold_target
+            remaining = sum(costs)
+            count = 0
+            while count < len(recent) and remaining > target:
+                remaining -= costs[count]
+                count += 1
+            if count < len(recent) and recent[count]["role"] == "assistant":
+                count += 1
+            self.folding = True
+            job = (self.summary, recent[:count], self.folded + count, self.generation)
+        get_executor().submit(self._fold, summarize, *job)
+        return True
+    
+    def _fold(self, summarize, summary, turns, folded, generation):
+        try:
+            summary = summarize(summary, turns)
+            with self.lock:
+                # Dropped if the chat was cleared meanwhile
+                if generation == self.generation:
+                    self.summary = summary
+                    self.folded = folded
+            get_metrics().incr("memory.folds")
+        finally:
+            with self.lock:
+                self.folding = False
+
+def message_tokens(message):
+    return estimate_tokens(message["content"]) + 4
+
+# Answer cache capacity and minimum seconds between quick-question pre-warms
+ANSWER_CACHE_SIZE = 256
+PREWARM_INTERVAL = 300
+
+# Questions offered on the Home page (and pre-warmed in the answer cache)
+QUICK_QUESTIONS = [
+    "Who's likely to win the Premier League this season?",
+    "Which player has the most goals in Champions League?",
+    "Show me the best young talents to watch",
+    "Analyze Arsenal's defensive performance"
+]
+
+# Case, punctuation and whitespace-insensitive form of a question
+def normalize_question(question):
+    return " ".join(TOKEN_PATTERN.findall(question.lower()))
+
+# Short hash identifying a serialized context
+def context_snapshot_id(context_text):
+    return hashlib.sha1(context_text.encode("utf-8")).hexdigest()[:16]
+
+# LRU cache of model answers keyed on (normalized question, context snapshot).
+# Storing an answer for a newer snapshot drops the question's older answers,
+# so entries expire as soon as the live/news data behind them changes.
+class AnswerCache:
+    def __init__(self, max_entries=ANSWER_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.latest_snapshot = {}
+        self.hits = 0
+        self.misses = 0
+        self.last_prewarm = 0.0
+    
+    def get(self, question, snapshot):
+        key = (normalize_question(question), snapshot)
+        with self.lock:
+            answer = self.entries.get(key)
+            if answer is None:
+                self.misses += 1
+            else:
+                self.entries.move_to_end(key)
+                self.hits += 1
+        get_metrics().incr("answer_cache.misses" if answer is None else "answer_cache.hits")
+        return answer
+    
+    def put(self, question, snapshot, answer):
+        normalized = normalize_question(question)
+        with self.lock:
+            previous = self.latest_snapshot.get(normalized)
+            if previous is not None and previous != snapshot:
+                self.entries.pop((normalized, previous), None)
+            self.latest_snapshot[normalized] = snapshot
+            self.entries[(normalized, snapshot)] = answer
+            self.entries.move_to_end((normalized, snapshot))
+            while len(self.entries) > self.max_entries:
+                (evicted, _), _ = self.entries.popitem(last=False)
+                if (evicted, self.latest_snapshot.get(evicted)) not in self.entries:
+                    self.latest_snapshot.pop(evicted, None)
+    
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+    
+    # True for at most one caller per interval, which then runs the pre-warm
+    def claim_prewarm(self, interval):
+        with self.lock:
+            now = time.monotonic()
+            if self.last_prewarm and now - self.last_prewarm < interval:
+                return False
+            self.last_prewarm = now
+            return True
+
+@st.cache_resource
+def get_answer_cache():
+    return AnswerCache()
 
-        return response.choices[0].message.content
+# Admission control for LLM calls, shared by all sessions: how many requests
+# may be in flight upstream at once, how many may wait for a slot (in total
+# and per session) and the longest a request waits before it is rejected.
+# max_queued = 0 rejects as soon as every slot is busy.
+LLM_QUEUE = {
+    "max_concurrency": 4,
+    "max_queued": 32,
+    "max_queued_per_session": 2,
+    "max_wait": 15.0
+}
+
+class LLMSaturated(Exception):
+    pass
+
+# Bounded-concurrency queue with per-session fairness. Waiting requests are
+# queued per session and a freed slot goes to the sessions in round-robin
+# order, so one session sending many questions can't starve the others.
+class FairLimiter:
+    def __init__(self, max_concurrency, max_queued, max_queued_per_session, max_wait):
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self.max_queued_per_session = max_queued_per_session
+        self.max_wait = max_wait
+        self.lock = threading.Lock()
+        self.active = 0
+        self.queued = 0
+        self.waiting = OrderedDict()
+    
+    def acquire(self, session):
+        metrics = get_metrics()
+        started = time.monotonic()
+        with self.lock:
+            if self.active < self.max_concurrency and not self.queued:
+                self.active += 1
+                metrics.observe("llm.queue_wait_ms", 0.0)
+                return
+            if self.queued >= self.max_queued:
+                metrics.incr("llm.rejected")
+                raise LLMSaturated("too many questions are waiting")
+            if len(self.waiting.get(session, ())) >= self.max_queued_per_session:
+                metrics.incr("llm.rejected")
+                raise LLMSaturated("your previous questions are still waiting")
+            waiter = threading.Event()
+            self.waiting.setdefault(session, deque()).append(waiter)
+            self.queued += 1
+            metrics.observe("llm.queue_depth", self.queued)
+        
+        if not waiter.wait(self.max_wait):
+            with self.lock:
+                # Re-check under the lock: the slot may have been handed over
+                # just as the wait timed out
+                if not waiter.is_set():
+                    queue = self.waiting[session]
+                    queue.remove(waiter)
+                    if not queue:
+                        del self.waiting[session]
+                    self.queued -= 1
+                    metrics.incr("llm.rejected")
+                    raise LLMSaturated(f"no slot became free within {self.max_wait:g}s")
+        metrics.observe("llm.queue_wait_ms", round((time.monotonic() - started) * 1000, 1))
+    
+    # Hand the slot straight to the next session in line, or free it
+    def release(self):
+        with self.lock:
+            if not self.waiting:
+                self.active -= 1
+                return
+            session, queue = next(iter(self.waiting.items()))
+            waiter = queue.popleft()
+            if queue:
+                self.waiting.move_to_end(session)
+            else:
+                del self.waiting[session]
+            self.queued -= 1
+            waiter.set()
+    
+    @contextmanager
+    def slot(self, session):
+        self.acquire(session)
+        try:
+            yield
+        finally:
+            self.release()
+    
+    def status(self):
+        with self.lock:
+            return {
+                "in_flight": self.active,
+                "queued": self.queued,
+                "sessions_waiting": len(self.waiting),
+                "max_concurrency": self.max_concurrency
+            }
+
+@st.cache_resource
+def get_llm_limiter():
+    return FairLimiter(**LLM_QUEUE)
+
+# Fairness key of the current session (background jobs share one key)
+def current_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "background"
+
+# Function to process the user's question using OpenAI
+def get_ai_response(client, question, context_data, session=None):
+    try:
+        context_text, context_stats = build_compact_context(select_relevant_context(question, context_data))
+        snapshot = context_stats["snapshot"]
+        answer_cache = get_answer_cache()
+        cached = answer_cache.get(question, snapshot)
+        if cached is not None:
+            return cached
+        
+        messages = build_ai_messages(question, context_text)
+        get_metrics().observe("llm.prompt_tokens", estimate_prompt_tokens(messages))
+        
+        with get_llm_limiter().slot(session or current_session_id()):
+            response = client.chat.completions.create(
+                model="gpt-4o",
+                messages=messages,
+            )
+
+        answer = response.choices[0].message.content
+        answer_cache.put(question, snapshot, answer)
+        return answer
     except Exception as e:
         return f"Error generating response: {e}"
 
+# Answer the Home quick questions in the background so the first click is
+# served from the answer cache
+def prewarm_answers(clients, questions=QUICK_QUESTIONS):
+    if get_answer_cache().claim_prewarm(PREWARM_INTERVAL):
+        get_executor().submit(_prewarm_answers, clients, questions)
+
+def _prewarm_answers(clients, questions):
+    context = {
+        "live_matches": fetch_data_from_sofascore(clients["sofascore_url"]),
+        "sports_news": fetch_sports_news(clients["news_api_url"], clients["news_api_params"]).get("articles", [])
+    }
+    for question in questions:
+        get_ai_response(get_openai_client(clients["openai_api_key"]), question, context, session="prewarm")
+
+# Streaming variant of get_ai_response: yields text deltas as they arrive.
+# The LLM slot is held until the stream ends. Closing the generator (e.g.
+# when a rerun interrupts the answer) closes the underlying HTTP stream and
+# frees the slot.
+def stream_ai_response(client, messages, session=None):
+    with get_llm_limiter().slot(session or current_session_id()):
+        stream = client.chat.completions.create(
+            model="gpt-4o",
+            messages=messages,
+            stream=True,
+        )
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+
+# Players known before any search (sample data until RapidAPI results arrive)
+SAMPLE_PLAYERS = [
+    {
+        "name": "Lionel Messi",
+        "age": 35,
+        "team": "Inter Miami CF",
+        "position": "Forward",
+        "nationality": "Argentina",
+        "image": "https://img.icons8.com/color/96/000000/messi.png"
+    },
+    {
+        "name": "Cristiano Ronaldo",
+        "age": 38,
+        "team": "Al-Nassr FC",
+        "position": "Forward",
+        "nationality": "Portugal",
+        "image": "https://img.icons8.com/color/96/000000/cristiano-ronaldo.png"
+    }
+]
+
+DEFAULT_PLAYER_IMAGE = "https://img.icons8.com/color/96/000000/football-player.png"
+
+# Minimum share of the query's trigrams a name must contain for a fuzzy
+# match to count as good enough to skip the RapidAPI call
+PLAYER_FUZZY_THRESHOLD = 0.6
+
+# Queries at least this long whose prefix lookup finds players skip the
+# fuzzy pass (as do exact name or name token matches)
+PLAYER_STRONG_PREFIX = 4
+
+# Lowercase, accent-free form of a name ("Ødegaard" -> "odegaard")
+def fold_name(text):
+    decomposed = unicodedata.normalize("NFKD", text.replace("ø", "o").replace("Ø", "O"))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[a-z0-9]+", stripped.lower()))
+
+def name_trigrams(folded):
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# Local player search index. Prefix lookups use a sorted array of
+# (folded name or name token, player id) searched with bisect; fuzzy lookups
+# count shared character trigrams, which tolerates typos, accents and partial
+# names. Fuzzy candidates come from the postings of the query's rarest
+# trigrams only, and their shared counts are looked up in the (sorted) other
+# postings, so the cost follows the candidates rather than the index size.
+# The index only grows as results come in.
+class PlayerIndex:
+    def __init__(self, players=()):
+        self.lock = threading.RLock()
+        self.players = []
+        self.ids = {}
+        self.names = []
+        self.grams = defaultdict(list)
+        self.gram_arrays = {}
+        self.gram_counts = np.zeros(0, dtype=np.int32)
+        self.add(players)
+    
+    def add(self, players):
+        with self.lock:
+            names = []
+            counts = []
+            touched = set()
+            for player in players:
+                folded = fold_name(player.get("name") or "")
+                key = player.get("id") or f"{folded}|{fold_name(player.get('team') or '')}"
+                if not folded or key in self.ids:
+                    continue
+                player_id = self.ids[key] = len(self.players)
+                self.players.append(player)
+                grams = name_trigrams(folded)
+                counts.append(len(grams))
+                for gram in grams:
+                    self.grams[gram].append(player_id)
+                touched |= grams
+                tokens = {folded} | {t for t in folded.split() if len(t) > 1}
+                names.extend((token, player_id) for token in tokens)
+            if not counts:
+                return 0
+            self.gram_counts = np.concatenate([self.gram_counts, np.array(counts, dtype=np.int32)])
+            # Rebuild the postings arrays here rather than on the first search
+            for gram in touched:
+                self.gram_arrays[gram] = np.array(self.grams[gram], dtype=np.int32)
+            if len(names) < 64:
+                for entry in names:
+                    bisect.insort(self.names, entry)
+            else:
+                self.names.extend(names)
+                self.names.sort()
+            return len(counts)
+    
+    # Ids of names or name tokens starting with the query, and whether one
+    # of them matched it exactly
+    def prefix(self, folded, limit):
+        ids = []
+        exact = False
+        position = bisect.bisect_left(self.names, (folded,))
+        while position < len(self.names) and len(ids) < limit:
+            token, player_id = self.names[position]
+            if not token.startswith(folded):
+                break
+            exact = exact or token == folded
+            if player_id not in ids:
+                ids.append(player_id)
+            position += 1
+        return ids, exact
+    
+    # [(score, player id)] of the best fuzzy matches: the share of the
+    # query's trigrams found in the name, ties broken by Dice similarity
+    def fuzzy(self, folded, limit, min_score=PLAYER_FUZZY_THRESHOLD):
+        all_grams = name_trigrams(folded)
+        postings = sorted((self.gram_arrays[gram] for gram in all_grams if gram in self.gram_arrays), key=len)
+        needed = max(math.ceil(min_score * len(all_grams) - 1e-9), 1)
+        if len(postings) < needed:
+            return []
+        # A name sharing `needed` of the query's trigrams contains at least one
+        # of any len(postings) - needed + 1 of them, so the rarest suffice.
+        # Candidates that can no longer reach `needed` are dropped as the
+        # remaining (more common) trigrams are checked.
+        rarest = len(postings) - needed + 1
+        candidates, shared = np.unique(np.concatenate(postings[:rarest]), return_counts=True)
+        for checked, posting in enumerate(postings[rarest:]):
+            alive = shared + len(postings) - rarest - checked >= needed
+            candidates, shared = candidates[alive], shared[alive]
+            if not len(candidates):
+                return []
+            position = np.minimum(np.searchsorted(posting, candidates), len(posting) - 1)
+            shared = shared + (posting[position] == candidates)
+        scores = shared / len(all_grams)
+        keep = scores >= min_score
+        candidates, shared, scores = candidates[keep], shared[keep], scores[keep]
+        dice = 2 * shared / (len(all_grams) + self.gram_counts[candidates])
+        best = np.lexsort((-dice, -scores))[:limit]
+        return [(float(scores[i]), int(candidates[i])) for i in best]
+    
+    # Returns (players, good) where good says whether the matches are
+    # strong enough to skip the upstream search
+    def search(self, query, limit=10):
+        folded = fold_name(query)
+        if not folded:
+            return [], False
+        with self.lock:
+            ids, exact = self.prefix(folded, limit)
+            good = bool(ids)
+            strong = exact or (ids and len(folded) >= PLAYER_STRONG_PREFIX)
+            if len(ids) < limit and not strong:
+                for score, player_id in self.fuzzy(folded, limit):
+                    good = True
+                    if player_id not in ids:
+                        ids.append(player_id)
+            return [self.players[i] for i in ids[:limit]], good
+
+@st.cache_resource
+def get_player_index():
+    return PlayerIndex(SAMPLE_PLAYERS)
+
+# Convert a RapidAPI players-search payload into player cards
+def parse_rapidapi_players(payload):
+    response = payload.get("response") or {}
+    suggestions = response.get("suggestions", []) if hasattr(response, "get") else response
+    players = []
+    for item in suggestions or []:
+        if item.get("type", "player") != "player" or not item.get("name"):
+            continue
+        players.append({
+            "id": f"rapidapi:{item.get('id')}" if item.get("id") else None,
+            "name": item.get("name"),
+            "age": item.get("age", "N/A"),
+            "team": item.get("teamName") or item.get("team") or "N/A",
+            "position": item.get("position", "N/A"),
+            "nationality": item.get("nationality") or item.get("country") or "N/A",
+            "image": item.get("image") or DEFAULT_PLAYER_IMAGE
+        })
+    return players
+
+# Search players locally first; RapidAPI is only called when the local index
+# has no good match, and its results are added to the index
+def search_players(clients, query):
+    metrics = get_metrics()
+    index = get_player_index()
+    started = time.perf_counter()
+    players, good = index.search(query)
+    metrics.observe("player_index.search_ms", round((time.perf_counter() - started) * 1000, 3))
+    if good or len(fold_name(query)) < 3:
+        return players
+    
+    metrics.incr("player_index.upstream_searches")
+    headers = {"X-RapidAPI-Key": clients["rapidapi_key"]}
+    params = {"search": query}
+    data = fetch_player_data(clients["rapidapi_url"], headers, params, is_offline_mode())
+    if index.add(parse_rapidapi_players(data)):
+        players, _ = index.search(query)
+    return players
+
+# Sample articles shown when NewsAPI returns nothing
+SAMPLE_NEWS = [
+    {
+        "title": "Premier League announces new broadcast deal",
+        "description": "The Premier League has announced a record-breaking new broadcast deal worth £5 billion for the next three seasons.",
+        "source": {"name": "BBC Sport"},
+        "publishedAt": "2024-04-10T10:30:00Z",
+        "urlToImage": "https://via.placeholder.com/300x200?text=Premier+League"
+    },
+    {
+        "title": "Champions League quarter-finals set to begin",
+        "description": "Eight teams remain in the hunt for European glory as the Champions League quarter-finals kick off this week.",
+        "source": {"name": "Sky Sports"},
+        "publishedAt": "2024-04-09T15:45:00Z",
+        "urlToImage": "https://via.placeholder.com/300x200?text=Champions+League"
+    },
+    {
+        "title": "Messi scores hat-trick in Inter Miami's victory",
+        "description": "Lionel Messi continued his exceptional form with a hat-trick in Inter Miami's 5-0 win in the MLS.",
+        "source": {"name": "ESPN"},
+        "publishedAt": "2024-04-08T08:20:00Z",
+        "urlToImage": "https://via.placeholder.com/300x200?text=Messi"
+    },
+    {
+        "title": "England announce squad for upcoming internationals",
+        "description": "Gareth Southgate has named his England squad for the upcoming international fixtures, with several surprise inclusions.",
+        "source": {"name": "The Guardian"},
+        "publishedAt": "2024-04-07T13:10:00Z",
+        "urlToImage": "https://via.placeholder.com/300x200?text=England"
+    },
+    {
+        "title": "Juventus sack manager after poor run of results",
+        "description": "Juventus have parted ways with their manager following a disappointing run of results in Serie A.",
+        "source": {"name": "Goal.com"},
+        "publishedAt": "2024-04-06T09:40:00Z",
+        "urlToImage": "https://via.placeholder.com/300x200?text=Juventus"
+    }
+]
+
+# Topics for the news filter, matched on title and description
+NEWS_TOPICS = {
+    "Premier League": ["premier league", "epl", "arsenal", "chelsea", "liverpool", "manchester city",
+                       "man city", "manchester united", "man utd", "tottenham", "newcastle", "aston villa"],
+    "Champions League": ["champions league", "ucl", "europa league", "conference league", "european glory"],
+    "La Liga": ["la liga", "laliga", "real madrid", "barcelona", "atletico madrid", "sevilla"],
+    "Serie A": ["serie a", "juventus", "inter milan", "ac milan", "napoli", "roma", "lazio"],
+    "Bundesliga": ["bundesliga", "bayern", "dortmund", "leverkusen", "rb leipzig"],
+    "International": ["international", "world cup", "euro 2024", "euros", "nations league", "national team",
+                      "squad for", "friendly", "qualifier", "qualifiers", "copa america"],
+    "Transfers": ["transfer", "transfers", "signs", "signing", "signed", "loan", "bid",
+                  "contract", "release clause", "medical", "joins", "sack", "sacked", "appoint", "appointed"]
+}
+
+# Near-duplicate detection: MinHash signatures over word shingles, banded
+# for LSH. 16 bands of 4 rows catch pairs from a Jaccard similarity of
+# about 0.5, which are then confirmed against NEWS_DUPLICATE_THRESHOLD.
+NEWS_SHINGLE_SIZE = 3
+NEWS_MINHASH_BANDS = 16
+NEWS_MINHASH_ROWS = 4
+NEWS_DUPLICATE_THRESHOLD = 0.5
+MINHASH_PRIME = (1 << 31) - 1
+
+# NewsAPI articles with content, without the "[Removed]" placeholders it
+# returns for withdrawn stories
+def usable_articles(articles):
+    return [a for a in articles if a.get("title") and a.get("title") != "[Removed]"]
+
+# News processing pipeline: normalizes a NewsAPI payload into a table once
+# per refresh. Topics are tagged into one boolean column per topic with a
+# precompiled matcher and syndicated copies of the same story are collapsed
+# into one row, so the source and topic filters are plain masks.
+class NewsPipeline:
+    def __init__(self, topics=NEWS_TOPICS, cache_size=4):
+        self.topics = {
+            topic: re.compile(r"\b(?:" + "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)) + r")\b", re.IGNORECASE)
+            for topic, keywords in topics.items()
+        }
+        num_hashes = NEWS_MINHASH_BANDS * NEWS_MINHASH_ROWS
+        rng = np.random.default_rng(2024)
+        self.hash_a = rng.integers(1, MINHASH_PRIME, num_hashes, dtype=np.int64)
+        self.hash_b = rng.integers(0, MINHASH_PRIME, num_hashes, dtype=np.int64)
+        self.lock = threading.Lock()
+        self.cache_size = cache_size
+        self.tables = OrderedDict()
+    
+    # Identity of a payload: the (url, publishedAt) of every article
+    @staticmethod
+    def fingerprint(articles):
+        return hash(tuple((a.get("url"), a.get("publishedAt"), a.get("title")) for a in articles))
+    
+    # Processed table for a payload, built once per distinct payload
+    def process(self, articles):
+        key = self.fingerprint(articles)
+        with self.lock:
+            table = self.tables.get(key)
+            if table is not None:
+                self.tables.move_to_end(key)
+                return table
+        
+        metrics = get_metrics()
+        started = time.perf_counter()
+        table = self.build(articles)
+        metrics.observe("news_pipeline.build_ms", round((time.perf_counter() - started) * 1000, 2))
+        metrics.observe("news_pipeline.duplicates", len(articles) - len(table))
+        with self.lock:
+            self.tables[key] = table
+            while len(self.tables) > self.cache_size:
+                self.tables.popitem(last=False)
+        return table
+    
+    def build(self, articles):
+        articles = usable_articles(articles)
+        table = pd.DataFrame({
+            "title": [a.get("title") for a in articles],
+            "description": [a.get("description") or "" for a in articles],
+            "source": [(a.get("source") or {}).get("name") or "Unknown" for a in articles],
+            "published": pd.to_datetime([a.get("publishedAt") for a in articles], utc=True, errors="coerce"),
+            "url": [a.get("url") for a in articles],
+            "image": [a.get("urlToImage") or "https://via.placeholder.com/300x200?text=Football" for a in articles]
+        })
+        text = table["title"].astype(str) + " " + table["description"].astype(str)
+        for topic, pattern in self.topics.items():
+            table[f"topic:{topic}"] = text.str.contains(pattern, regex=True)
+        
+        # Collapse each duplicate cluster into its earliest article and keep
+        # the names of the outlets that syndicated it
+        clusters = self.duplicate_clusters(text.tolist())
+        table["cluster"] = clusters
+        table = table.sort_values("published", kind="stable")
+        sources = table.groupby("cluster", sort=False)["source"].agg(lambda names: list(dict.fromkeys(names)))
+        table = table.drop_duplicates("cluster").copy()
+        table["also_in"] = [names[1:] for names in sources.loc[table["cluster"]]]
+        table["source"] = table["source"].astype("category")
+        return table.sort_values("published", ascending=False, kind="stable").reset_index(drop=True)
+    
+    # MinHash signature (one row per document) of each document's shingles
+    def signatures(self, texts):
+        signatures = np.full((len(texts), len(self.hash_a)), MINHASH_PRIME, dtype=np.int64)
+        for row, text in enumerate(texts):
+            words = re.findall(r"\w+", text.lower())
+            shingles = {" ".join(words[i:i + NEWS_SHINGLE_SIZE]) for i in range(max(len(words) - NEWS_SHINGLE_SIZE + 1, 1))}
+            hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.int64, count=len(shingles)) % MINHASH_PRIME
+            signatures[row] = ((np.outer(hashes, self.hash_a) + self.hash_b) % MINHASH_PRIME).min(axis=0)
+        return signatures
+    
+    # Cluster id per document; documents sharing an LSH band are merged when
+    # their estimated Jaccard similarity is at least NEWS_DUPLICATE_THRESHOLD
+    def duplicate_clusters(self, texts):
+        parent = list(range(len(texts)))
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        signatures = self.signatures(texts)
+        for band in range(NEWS_MINHASH_BANDS):
+            buckets = defaultdict(list)
+            rows = signatures[:, band * NEWS_MINHASH_ROWS:(band + 1) * NEWS_MINHASH_ROWS]
+            for doc, key in enumerate(map(bytes, rows)):
+                buckets[key].append(doc)
+            for docs in buckets.values():
+                for other in docs[1:]:
+                    a, b = find(docs[0]), find(other)
+                    if a != b and (signatures[docs[0]] == signatures[other]).mean() >= NEWS_DUPLICATE_THRESHOLD:
+                        parent[b] = a
+        return [find(i) for i in range(len(texts))]
+
+@st.cache_resource
+def get_news_pipeline():
+    return NewsPipeline()
+
+# Trending topics: terms decay with a half-life, so a story from yesterday
+# counts half as much as one from TREND_HALF_LIFE seconds later. Counts live
+# in a fixed-size count-min sketch; only TREND_CANDIDATES heavy hitters are
+# tracked by name.
+TREND_HALF_LIFE = 6 * 3600
+TREND_SKETCH_WIDTH = 2048
+TREND_SKETCH_DEPTH = 4
+TREND_CANDIDATES = 200
+TREND_SEEN_ARTICLES = 5000
+# A phrase replaces its words in the top list when it scores at least this
+# share of the more frequent word ("champions league" over "league")
+TREND_PHRASE_SHARE = 0.5
+TREND_STOPWORDS = STOPWORDS | frozenset([
+    "after", "against", "all", "but", "can", "could", "did", "does", "football", "game", "get",
+    "his", "into", "its", "just", "latest", "more", "new", "news", "not", "one", "out", "over",
+    "says", "said", "season", "soccer", "than", "their", "they", "two", "up", "set", "week", "win",
+    "were", "would", "year", "had", "her", "him", "our", "off", "first", "last", "back"
+])
+
+# Incrementally maintained trending terms. add_articles() only tokenizes
+# articles it has not seen; top() reads the bounded candidate set, so the
+# News page pays nothing for it at render time.
+class TrendingTopics:
+    def __init__(self, half_life=TREND_HALF_LIFE):
+        self.decay = math.log(2) / half_life
+        self.reference = time.time()
+        self.sketch = np.zeros((TREND_SKETCH_DEPTH, TREND_SKETCH_WIDTH))
+        self.candidates = {}
+        # Lower bound of the weakest candidate's score; scores only grow, so
+        # terms estimated below it are rejected without scanning
+        self.candidate_floor = 0.0
+        self.seen = set()
+        self.seen_order = deque()
+        self.lock = threading.Lock()
+    
+    # Unigrams and bigrams of an article's title and description
+    @staticmethod
+    def terms(article):
+        text = f"{article.get('title') or ''}. {article.get('description') or ''}"
+        terms = set()
+        for sentence in re.split(r"[.!?:;|\-–—]+\s", text):
+            # Bigrams only join words that are adjacent in the text
+            previous = None
+            for word in TOKEN_PATTERN.findall(sentence.lower()):
+                if len(word) < 3 or word.isdigit() or word in TREND_STOPWORDS:
+                    previous = None
+                    continue
+                terms.add(word)
+                if previous:
+                    terms.add(f"{previous} {word}")
+                previous = word
+        return list(terms)
+    
+    # Scores are stored relative to self.reference, growing by exp(decay *
+    # age) for newer articles, which decays every older count at once.
+    # Rebase before the weights overflow.
+    def _weight(self, timestamp):
+        exponent = self.decay * (timestamp - self.reference)
+        if exponent > 500:
+            factor = math.exp(-exponent)
+            self.sketch *= factor
+            self.candidates = {term: score * factor for term, score in self.candidates.items()}
+            self.candidate_floor *= factor
+            self.reference = timestamp
+            exponent = 0
+        return math.exp(exponent)
+    
+    # Add one article's terms to the sketch in a single vectorized update,
+    # then refresh the candidates with the new estimates
+    def _add(self, terms, weight):
+        encoded = [term.encode() for term in terms]
+        columns = np.array([
+            [zlib.crc32(data, seed) for data in encoded] for seed in range(1, TREND_SKETCH_DEPTH + 1)
+        ]) % TREND_SKETCH_WIDTH
+        rows = np.arange(TREND_SKETCH_DEPTH)[:, None]
+        np.add.at(self.sketch, (rows, columns), weight)
+        estimates = self.sketch[rows, columns].min(axis=0)
+        
+        for term, estimate in zip(terms, estimates.tolist()):
+            if term in self.candidates or len(self.candidates) < TREND_CANDIDATES:
+                self.candidates[term] = estimate
+                continue
+            if estimate <= self.candidate_floor:
+                continue
+            weakest = min(self.candidates, key=self.candidates.get)
+            self.candidate_floor = self.candidates[weakest]
+            if estimate > self.candidate_floor:
+                del self.candidates[weakest]
+                self.candidates[term] = estimate
+    
+    # Count the terms of articles not seen before; returns how many were new
+    def add_articles(self, articles):
+        now = time.time()
+        added = 0
+        with self.lock:
+            for article in usable_articles(articles):
+                key = article.get("url") or article.get("title")
+                if not key or key in self.seen:
+                    continue
+                self.seen.add(key)
+                self.seen_order.append(key)
+                if len(self.seen_order) > TREND_SEEN_ARTICLES:
+                    self.seen.discard(self.seen_order.popleft())
+                try:
+                    published = datetime.fromisoformat(article.get("publishedAt", "").replace("Z", "+00:00")).timestamp()
+                except (AttributeError, ValueError):
+                    published = now
+                terms = self.terms(article)
+                if terms:
+                    self._add(terms, self._weight(min(published, now)))
+                added += 1
+        if added:
+            get_metrics().incr("trending.articles", added)
+        return added
+    
+    # The k highest scoring terms, phrases preferred over their own words
+    def top(self, k=5):
+        with self.lock:
+            ranked = heapq.nlargest(k * 4, self.candidates.items(), key=lambda item: item[1])
+        scores = dict(ranked)
+        hidden = set()
+        for term, score in ranked:
+            for word in term.split() if " " in term else ():
+                if score >= TREND_PHRASE_SHARE * scores.get(word, 0):
+                    hidden.add(word)
+        return [term for term, score in ranked if term not in hidden][:k]
+
+@st.cache_resource
+def get_trending_topics():
+    return TrendingTopics()
+
+# "champions league" -> "#ChampionsLeague"
+def hashtag(term):
+    return "#" + "".join(word.capitalize() for word in term.split())
+
+# Shared figure layer: finished Plotly figures memoized by a hash of the
+# builder and its input data, so every session rendering the same data
+# reuses one figure instead of rebuilding it on each rerun. Cached figures
+# are shared and must be treated as read-only.
+FIGURE_CACHE_SIZE = 256
+# Line/scatter series longer than this switch to WebGL, and are downsampled
+# to at most FIGURE_MAX_POINTS points
+FIGURE_WEBGL_THRESHOLD = 500
+FIGURE_MAX_POINTS = 2000
+
+# Feed a stable digest of a chart's input data into a hashlib object
+def data_fingerprint(value, digest):
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(repr(value.name).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"[{len(value)}".encode())
+        for item in value:
+            data_fingerprint(item, digest)
+    elif isinstance(value, dict):
+        digest.update(f"{{{len(value)}".encode())
+        for key in sorted(value, key=repr):
+            data_fingerprint(key, digest)
+            data_fingerprint(value[key], digest)
+    else:
+        digest.update(repr(value).encode())
+
+class FigureCache:
+    def __init__(self, max_entries=FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.figures = OrderedDict()
+    
+    def get(self, builder, args, kwargs):
+        digest = hashlib.sha1(builder.__qualname__.encode())
+        data_fingerprint((args, kwargs), digest)
+        key = digest.hexdigest()
+        metrics = get_metrics()
+        with self.lock:
+            fig = self.figures.get(key)
+            if fig is not None:
+                self.figures.move_to_end(key)
+                metrics.incr("figure_cache.hits")
+                return fig
+        
+        # Sessions asking for the same new figure wait for one build
+        def build():
+            started = time.perf_counter()
+            fig = builder(*args, **kwargs)
+            metrics.observe("figure_cache.build_ms", round((time.perf_counter() - started) * 1000, 1))
+            return fig
+        fig = get_single_flight().do(("figure", key), build)
+        metrics.incr("figure_cache.misses")
+        with self.lock:
+            self.figures[key] = fig
+            while len(self.figures) > self.max_entries:
+                self.figures.popitem(last=False)
+        return fig
+
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+# builder(*args, **kwargs), built once per distinct input data
+def cached_figure(builder, *args, **kwargs):
+    return get_figure_cache().get(builder, args, kwargs)
+
+# Indices of at most max_points points keeping each bucket's minimum and
+# maximum (plus both ends), so peaks survive downsampling
+def downsample_indices(values, max_points=FIGURE_MAX_POINTS):
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    buckets = max_points // 2 - 1
+    bucket = np.arange(n) * buckets // n
+    order = np.lexsort((values, bucket))
+    ends = np.searchsorted(bucket, np.arange(buckets), side="right")
+    starts = np.concatenate([[0], ends[:-1]])
+    return np.unique(np.concatenate([[0, n - 1], order[starts], order[ends - 1]]))
+
 # Function to create football match statistics chart
 def create_match_stats_chart(team1="Team A", team2="Team B"):
     # Sample data - would be replaced with real data in production
@@ -309,63 +2422,53 @@ def create_player_comparison(player1="Player 1", player2="Player 2"):
     
     return fig
 
-# Function to create team form chart
-def create_team_form_chart(team="Team A"):
-    # Sample data - would be replaced with real data in production
-    last_matches = ['W', 'L', 'W', 'W', 'D', 'L', 'W', 'W', 'D', 'W']
-    match_points = []
-    cumulative_points = []
-    total = 0
-    
-    for result in last_matches:
-        if result == 'W':
-            points = 3
-        elif result == 'D':
-            points = 1
-        else:
-            points = 0
-        match_points.append(points)
-        total += points
-        cumulative_points.append(total)
+# Function to create team form chart. form has one row per match (oldest
+# first) with a W/D/L "result" and an optional hover "label".
+def create_team_form_chart(team="Team A", form=None):
+    if form is None:
+        # Sample data - would be replaced with real data in production
+        form = pd.DataFrame({"result": ['W', 'L', 'W', 'W', 'D', 'L', 'W', 'W', 'D', 'W']})
     
-    matches = [f"Match {i+1}" for i in range(len(last_matches))]
+    results = form["result"].to_numpy()
+    match_points = np.select([results == 'W', results == 'D'], [3, 1], 0)
+    cumulative_points = np.cumsum(match_points)
+    match_numbers = np.arange(1, len(results) + 1)
+    labels = form["label"].to_numpy() if "label" in form else np.char.add("Match ", match_numbers.astype(str))
+    
+    # One trace with per-point marker colors instead of one trace per match;
+    # long histories are downsampled and drawn with WebGL
+    shown = downsample_indices(cumulative_points)
+    large = len(shown) > FIGURE_WEBGL_THRESHOLD or len(shown) < len(results)
+    scatter = go.Scattergl if large else go.Scatter
+    colors = np.select([results == 'W', results == 'D'], ['#28a745', '#ffc107'], '#dc3545')
     
     fig = go.Figure()
     
-    fig.add_trace(go.Scatter(
-        x=matches,
-        y=cumulative_points,
+    fig.add_trace(scatter(
+        x=match_numbers[shown],
+        y=cumulative_points[shown],
         mode='lines+markers',
         name='Cumulative Points',
-        line=dict(color='#3366ff', width=3),
-        marker=dict(size=10)
+        line=dict(color='#3366ff', width=2 if large else 3),
+        marker=dict(
+            color=colors[shown],
+            size=6 if large else 12,
+            line=dict(
+                color='white',
+                width=1 if large else 2
+            )
+        ),
+        customdata=np.column_stack([labels[shown], results[shown], match_points[shown]]),
+        hovertemplate=
+        '%{customdata[0]}<br>' +
+        'Result: %{customdata[1]}<br>' +
+        'Points: %{customdata[2]}<br>' +
+        'Total: %{y}<extra></extra>',
+        showlegend=False
     ))
     
-    # Add color-coded points for each match result
-    for i, result in enumerate(last_matches):
-        color = '#28a745' if result == 'W' else '#ffc107' if result == 'D' else '#dc3545'
-        fig.add_trace(go.Scatter(
-            x=[matches[i]],
-            y=[cumulative_points[i]],
-            mode='markers',
-            marker=dict(
-                color=color,
-                size=12,
-                line=dict(
-                    color='white',
-                    width=2
-                )
-            ),
-            showlegend=False,
-            hovertemplate=
-            f'Match {i+1}<br>' +
-            f'Result: {result}<br>' +
-            f'Points: {match_points[i]}<br>' +
-            f'Total: {cumulative_points[i]}'
-        ))
-    
     fig.update_layout(
-        title=f"{team} - Form in Last 10 Matches",
+        title=f"{team} - Form in Last {len(results)} Matches",
         xaxis_title="Matches",
         yaxis_title="Points",
         hovermode="closest"
@@ -373,24 +2476,408 @@ def create_team_form_chart(team="Team A"):
     
     return fig
 
-# Function to create league standings table
-def create_league_standings():
-    # Sample data - would be replaced with real data in production
-    data = {
-        'Position': list(range(1, 11)),
-        'Team': ['Team A', 'Team B', 'Team C', 'Team D', 'Team E', 
-                 'Team F', 'Team G', 'Team H', 'Team I', 'Team J'],
-        'Played': [10, 10, 10, 10, 10, 10, 10, 10, 10, 10],
-        'Won': [8, 7, 6, 6, 5, 5, 4, 3, 2, 1],
-        'Drawn': [1, 2, 2, 1, 3, 2, 2, 3, 3, 2],
-        'Lost': [1, 1, 2, 3, 2, 3, 4, 4, 5, 7],
-        'GF': [25, 23, 18, 17, 15, 14, 12, 10, 8, 6],
-        'GA': [8, 9, 10, 12, 11, 13, 15, 16, 18, 22],
-        'GD': [17, 14, 8, 5, 4, 1, -3, -6, -10, -16],
-        'Points': [25, 23, 20, 19, 18, 17, 14, 12, 9, 5]
+# Function to create a player attribute radar chart
+def create_attribute_radar(name, attributes, values):
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatterpolar(
+        r=values,
+        theta=attributes,
+        fill='toself',
+        name=name,
+        line_color='#3366ff'
+    ))
+    
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100]
+            )
+        ),
+        showlegend=False,
+        title="Player Attributes"
+    )
+    
+    return fig
+
+# Function to create a player's goals and assists per recent match chart
+def create_recent_matches_chart(match_nums, goals, assists):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=match_nums,
+        y=goals,
+        mode='lines+markers',
+        name='Goals',
+        line=dict(color='#3366ff', width=3),
+        marker=dict(size=10)
+    ))
+    fig.add_trace(go.Scatter(
+        x=match_nums,
+        y=assists,
+        mode='lines+markers',
+        name='Assists',
+        line=dict(color='#ff3366', width=3),
+        marker=dict(size=10)
+    ))
+    fig.update_layout(
+        title=f"Performance in Last {len(match_nums)} Matches",
+        xaxis_title="Match Number",
+        yaxis_title="Count",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig
+
+# Function to create a player's goals and assists per season chart
+def create_career_chart(seasons, goals, assists):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=seasons,
+        y=goals,
+        name='Goals',
+        marker_color='#3366ff'
+    ))
+    fig.add_trace(go.Bar(
+        x=seasons,
+        y=assists,
+        name='Assists',
+        marker_color='#ff3366'
+    ))
+    fig.update_layout(
+        title="Goals and Assists by Season",
+        xaxis_title="Season",
+        yaxis_title="Count",
+        barmode='group',
+        xaxis={'categoryorder':'array', 'categoryarray':seasons[::-1]}
+    )
+    return fig
+
+# Function to create a leaderboard bar chart (top scorers, assists, ...)
+def create_leaderboard_chart(df, value, title, yaxis_title):
+    fig = px.bar(df, x="Player", y=value, 
+                text=value, color="Team", 
+                title=title)
+    fig.update_layout(xaxis_title="", yaxis_title=yaxis_title)
+    return fig
+
+# Function to create the title race pie chart
+def create_title_race_chart(title_df, league):
+    fig = px.pie(title_df, values="Probability", names="Team", 
+                title=f"{league} Title Race Probabilities",
+                color_discrete_sequence=px.colors.sequential.Blues)
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+# Function to create the goals vs expected goals chart
+def create_xg_chart(xg_df):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=xg_df["Team"],
+        y=xg_df["Goals"],
+        name="Actual Goals",
+        marker_color='#3366ff'
+    ))
+    fig.add_trace(go.Bar(
+        x=xg_df["Team"],
+        y=xg_df["xG"],
+        name="Expected Goals (xG)",
+        marker_color='#ff3366'
+    ))
+    fig.update_layout(
+        title="Goals vs Expected Goals (xG) by Team",
+        xaxis_title="Team",
+        yaxis_title="Goals",
+        barmode='group',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig
+
+# Function to create the progressive passing vs carrying chart; large
+# player sets switch to WebGL
+def create_progressive_chart(prog_df):
+    fig = px.scatter(prog_df, x="Progressive Passes", y="Progressive Carries", 
+                     color="Team", size="Progressive Passes", 
+                     hover_name="Player", 
+                     title="Progressive Passing vs. Carrying by Player",
+                     color_discrete_sequence=px.colors.qualitative.Plotly,
+                     render_mode="webgl" if len(prog_df) > FIGURE_WEBGL_THRESHOLD else "auto")
+    fig.update_layout(
+        xaxis_title="Progressive Passes",
+        yaxis_title="Progressive Carries",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig
+
+# Clubs per league for the sample results (ordered roughly by strength)
+LEAGUE_TEAMS = {
+    "Premier League": [
+        "Manchester City", "Arsenal", "Liverpool", "Aston Villa", "Tottenham", "Chelsea", "Newcastle",
+        "Manchester United", "West Ham", "Crystal Palace", "Brighton", "Bournemouth", "Fulham", "Wolves",
+        "Everton", "Brentford", "Nottingham Forest", "Luton Town", "Burnley", "Sheffield United"
+    ],
+    "La Liga": [
+        "Real Madrid", "Barcelona", "Girona", "Atletico Madrid", "Athletic Bilbao", "Real Sociedad",
+        "Real Betis", "Villarreal", "Valencia", "Alaves", "Osasuna", "Getafe", "Celta Vigo", "Sevilla",
+        "Mallorca", "Las Palmas", "Rayo Vallecano", "Cadiz", "Almeria", "Granada"
+    ],
+    "Bundesliga": [
+        "Bayer Leverkusen", "Bayern Munich", "VfB Stuttgart", "RB Leipzig", "Borussia Dortmund",
+        "Eintracht Frankfurt", "Hoffenheim", "Heidenheim", "Werder Bremen", "Freiburg", "Augsburg",
+        "Wolfsburg", "Mainz", "Borussia Monchengladbach", "Union Berlin", "Bochum", "Koln", "Darmstadt"
+    ],
+    "Serie A": [
+        "Inter", "AC Milan", "Juventus", "Atalanta", "Bologna", "Roma", "Lazio", "Fiorentina", "Torino",
+        "Napoli", "Genoa", "Monza", "Verona", "Lecce", "Udinese", "Cagliari", "Empoli", "Frosinone",
+        "Sassuolo", "Salernitana"
+    ],
+    "Ligue 1": [
+        "Paris Saint-Germain", "Monaco", "Brest", "Lille", "Nice", "Lyon", "Lens", "Marseille", "Reims",
+        "Rennes", "Toulouse", "Montpellier", "Strasbourg", "Nantes", "Le Havre", "Metz", "Lorient", "Clermont"
+    ]
+}
+
+# Ranking rules per league: tiebreakers applied after points (see
+# STANDINGS_KEYS) and the number of relegation places
+LEAGUE_RULES = {
+    "Premier League": {"tiebreakers": ("goal_difference", "goals_for", "head_to_head"), "relegation": 3},
+    "La Liga": {"tiebreakers": ("head_to_head", "head_to_head_goal_difference", "goal_difference", "goals_for"), "relegation": 3},
+    "Bundesliga": {"tiebreakers": ("goal_difference", "goals_for", "head_to_head"), "relegation": 2},
+    "Serie A": {"tiebreakers": ("head_to_head", "head_to_head_goal_difference", "goal_difference", "goals_for"), "relegation": 3},
+    "Ligue 1": {"tiebreakers": ("goal_difference", "head_to_head", "head_to_head_goal_difference", "goals_for"), "relegation": 2}
+}
+
+# Seasons of sample results per league; the last one is in progress with
+# this share of its rounds played
+SAMPLE_SEASONS = ["2021-22", "2022-23", "2023-24"]
+SAMPLE_PLAYED_SHARE = 0.8
+
+# A league's results: version is bumped whenever results change, results
+# holds played matches (season, round, date, home, away, home_goals,
+# away_goals) and fixtures the unplayed ones of the current season
+LeagueData = namedtuple("LeagueData", ["version", "results", "fixtures"])
+
+# Double round robin (circle method): list of rounds of (home, away) indices
+def round_robin(n):
+    teams = list(range(n))
+    rounds = []
+    for r in range(n - 1):
+        pairs = [(teams[i], teams[n - 1 - i]) for i in range(n // 2)]
+        rounds.append([(a, b) if (r + i) % 2 == 0 else (b, a) for i, (a, b) in enumerate(pairs)])
+        teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+    return rounds + [[(b, a) for a, b in matches] for matches in rounds]
+
+# Seeded sample results and fixtures for a league: Poisson goals from fixed
+# team strengths, drawn for all matches at once
+def sample_league_data(league):
+    teams = LEAGUE_TEAMS[league]
+    n = len(teams)
+    rng = np.random.default_rng(zlib.crc32(league.encode()))
+    strength = np.linspace(0.4, -0.4, n) + rng.normal(0, 0.1, n)
+    rounds = round_robin(n)
+    pairs = np.array([match for matches in rounds for match in matches])
+    round_numbers = np.repeat(np.arange(1, len(rounds) + 1), n // 2)
+    
+    seasons = []
+    for season in SAMPLE_SEASONS:
+        drift = strength + rng.normal(0, 0.1, n)
+        home_rate = np.exp(0.3 + drift[pairs[:, 0]] - 0.8 * drift[pairs[:, 1]])
+        away_rate = np.exp(0.05 + drift[pairs[:, 1]] - 0.8 * drift[pairs[:, 0]])
+        kickoff = pd.Timestamp(f"{season[:4]}-08-12")
+        seasons.append(pd.DataFrame({
+            "season": season,
+            "round": round_numbers,
+            "date": kickoff + pd.to_timedelta((round_numbers - 1) * 7, unit="D"),
+            "home": pd.Categorical.from_codes(pairs[:, 0], teams),
+            "away": pd.Categorical.from_codes(pairs[:, 1], teams),
+            "home_goals": rng.poisson(home_rate),
+            "away_goals": rng.poisson(away_rate)
+        }))
+    matches = pd.concat(seasons, ignore_index=True)
+    matches["season"] = matches["season"].astype("category")
+    
+    played_rounds = int(len(rounds) * SAMPLE_PLAYED_SHARE)
+    pending = (matches["season"] == SAMPLE_SEASONS[-1]).to_numpy() & (matches["round"] > played_rounds).to_numpy()
+    fixtures = matches[pending].drop(columns=["home_goals", "away_goals"]).reset_index(drop=True)
+    return matches[~pending].reset_index(drop=True), fixtures
+
+# Process-wide match results per league. Readers get an immutable
+# LeagueData; add_results() publishes a new one with a higher version,
+# which is what the derived tables (standings, ...) are memoized on.
+class ResultsStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.leagues = {}
+    
+    def get(self, league):
+        with self.lock:
+            data = self.leagues.get(league)
+            if data is None:
+                results, fixtures = sample_league_data(league)
+                data = self.leagues[league] = LeagueData(1, results, fixtures)
+            return data
+    
+    # Record played matches (DataFrame with the results columns); matching
+    # fixtures are removed
+    def add_results(self, league, matches):
+        data = self.get(league)
+        with self.lock:
+            played = pd.MultiIndex.from_frame(matches[["season", "home", "away"]].astype(str))
+            fixture_keys = pd.MultiIndex.from_frame(data.fixtures[["season", "home", "away"]].astype(str))
+            results = pd.concat([data.results, matches], ignore_index=True)
+            for column in ["season", "home", "away"]:
+                results[column] = results[column].astype("category")
+            fixtures = data.fixtures[~fixture_keys.isin(played)].reset_index(drop=True)
+            data = self.leagues[league] = LeagueData(data.version + 1, results, fixtures)
+            return data
+
+@st.cache_resource
+def get_results_store():
+    return ResultsStore()
+
+# Ranking keys: the overall table and the mini-league between teams still
+# level on every key before the first head-to-head key
+STANDINGS_KEYS = {
+    "points", "goal_difference", "goals_for", "wins",
+    "head_to_head", "head_to_head_goal_difference", "head_to_head_goals_for"
+}
+
+# Played/W/D/L/GF/GA per team over the matches selected by mask, all with
+# np.bincount over team codes
+def tally_matches(home, away, home_goals, away_goals, n, mask=None):
+    if mask is not None:
+        home, away, home_goals, away_goals = home[mask], away[mask], home_goals[mask], away_goals[mask]
+    def count(weights_home, weights_away):
+        return (np.bincount(home, weights_home, minlength=n) + np.bincount(away, weights_away, minlength=n)).astype(np.int64)
+    ones = np.ones(len(home))
+    return {
+        "played": count(ones, ones),
+        "won": count(home_goals > away_goals, away_goals > home_goals),
+        "drawn": count(home_goals == away_goals, home_goals == away_goals),
+        "goals_for": count(home_goals, away_goals),
+        "goals_against": count(away_goals, home_goals)
+    }
+
+# Position of each team of a column in names (-1 if absent); categorical
+# columns are mapped once per category instead of once per match
+def team_codes(column, names):
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        mapping = np.append(names.get_indexer(column.cat.categories), -1)
+        return mapping[column.cat.codes.to_numpy()]
+    return names.get_indexer(column)
+
+# League table from a results table (home, away, home_goals, away_goals).
+# Ranked by points, then each tiebreaker in order, then team name.
+def compute_standings(results, tiebreakers=("goal_difference", "goals_for"), teams=None):
+    if teams is None:
+        teams = pd.unique(np.concatenate([results["home"].astype(str), results["away"].astype(str)]))
+    names = pd.Index(teams)
+    n = len(names)
+    home = team_codes(results["home"], names)
+    away = team_codes(results["away"], names)
+    known = (home >= 0) & (away >= 0)
+    home, away = home[known], away[known]
+    home_goals = results["home_goals"].to_numpy()[known].astype(np.int64)
+    away_goals = results["away_goals"].to_numpy()[known].astype(np.int64)
+    
+    totals = tally_matches(home, away, home_goals, away_goals, n)
+    points = 3 * totals["won"] + totals["drawn"]
+    values = {
+        "points": points,
+        "goal_difference": totals["goals_for"] - totals["goals_against"],
+        "goals_for": totals["goals_for"],
+        "wins": totals["won"]
     }
     
-    df = pd.DataFrame(data)
+    keys = [points]
+    for tiebreaker in tiebreakers:
+        if tiebreaker not in STANDINGS_KEYS:
+            raise ValueError(f"Unknown tiebreaker: {tiebreaker}")
+        if tiebreaker.startswith("head_to_head") and "head_to_head" not in values:
+            # Teams level on all keys so far form groups; only matches
+            # between two teams of the same group count
+            _, group = np.unique(np.column_stack(keys), axis=0, return_inverse=True)
+            group = group.ravel()
+            mini = tally_matches(home, away, home_goals, away_goals, n, group[home] == group[away])
+            values["head_to_head"] = 3 * mini["won"] + mini["drawn"]
+            values["head_to_head_goal_difference"] = mini["goals_for"] - mini["goals_against"]
+            values["head_to_head_goals_for"] = mini["goals_for"]
+        keys.append(values[tiebreaker])
+    
+    # np.lexsort sorts by its last key first
+    order = np.lexsort([names.argsort().argsort()] + [-key for key in reversed(keys)])
+    return pd.DataFrame({
+        "Position": np.arange(1, n + 1),
+        "Team": names[order],
+        "Played": totals["played"][order],
+        "Won": totals["won"][order],
+        "Drawn": totals["drawn"][order],
+        "Lost": (totals["played"] - totals["won"] - totals["drawn"])[order],
+        "GF": totals["goals_for"][order],
+        "GA": totals["goals_against"][order],
+        "GD": values["goal_difference"][order],
+        "Points": points[order]
+    })
+
+# Team form windows on the Team Analysis tab: matches to show (None = all)
+FORM_WINDOWS = {"Last 10 Matches": 10, "This Season": "season", "All Seasons": None}
+
+# A team's results (oldest first) with W/D/L and hover labels, from the
+# league it plays in. window: number of recent matches, "season" for the
+# current season or None for the whole history.
+def team_form(team, window=None):
+    league = next((name for name, teams in LEAGUE_TEAMS.items() if team in teams), None)
+    if league is None:
+        return None
+    results = get_results_store().get(league).results
+    home = (results["home"] == team).to_numpy()
+    away = (results["away"] == team).to_numpy()
+    played = results[home | away].sort_values("date", kind="stable")
+    if window == "season":
+        played = played[(played["season"] == SAMPLE_SEASONS[-1]).to_numpy()]
+    elif window is not None:
+        played = played.tail(window)
+    
+    at_home = (played["home"] == team).to_numpy()
+    scored = np.where(at_home, played["home_goals"], played["away_goals"])
+    conceded = np.where(at_home, played["away_goals"], played["home_goals"])
+    opponent = np.where(at_home, played["away"].astype(str), played["home"].astype(str))
+    result = np.select([scored > conceded, scored == conceded], ["W", "D"], "L")
+    label = (
+        played["date"].dt.strftime("%Y-%m-%d").to_numpy().astype(str)
+        + np.where(at_home, " vs ", " at ") + opponent.astype(str)
+        + " " + scored.astype(str) + "-" + conceded.astype(str)
+    )
+    return pd.DataFrame({"result": result, "label": label})
+
+# Standings of one league season, memoized per league and data version
+@st.cache_data(max_entries=64)
+def league_standings(league, version, season):
+    data = get_results_store().get(league)
+    results = data.results[(data.results["season"] == season).to_numpy()]
+    return compute_standings(results, LEAGUE_RULES[league]["tiebreakers"], LEAGUE_TEAMS[league])
+
+# Function to create league standings table
+def create_league_standings(league="Premier League", season=SAMPLE_SEASONS[-1]):
+    data = get_results_store().get(league)
+    df = league_standings(league, data.version, season)
     
     # Format the table with styling
     styled_df = df.style.apply(lambda x: ['background-color: #e6f3ff' if i % 2 == 0 else '' 
@@ -405,6 +2892,346 @@ def create_league_standings():
     
     return styled_df
 
+# Match prediction model (Dixon-Coles): log goal rates are intercept +
+# attack of the scoring team + defence of the conceding team (+ home
+# advantage), fitted as a weighted Poisson GLM where older matches count
+# less (half-life in days). Low scores are corrected with the rho factor.
+PREDICTION_HALF_LIFE_DAYS = 240
+PREDICTION_MAX_GOALS = 10
+PREDICTION_L2 = 1e-3
+DIXON_COLES_RHO_GRID = np.linspace(-0.25, 0.25, 101)
+
+# Dixon-Coles low-score correction tau for every rho of a grid (rows) and
+# every match (columns); 1 outside the 0/1-goal scorelines
+def dixon_coles_tau(home_goals, away_goals, home_rate, away_rate, rho):
+    rho = np.asarray(rho, dtype=float).reshape(-1, 1)
+    tau = np.ones((len(rho), len(home_goals)))
+    tau = np.where((home_goals == 0) & (away_goals == 0), 1 - home_rate * away_rate * rho, tau)
+    tau = np.where((home_goals == 0) & (away_goals == 1), 1 + home_rate * rho, tau)
+    tau = np.where((home_goals == 1) & (away_goals == 0), 1 + away_rate * rho, tau)
+    tau = np.where((home_goals == 1) & (away_goals == 1), 1 - rho, tau)
+    return np.clip(tau, 1e-10, None)
+
+# Team-strength model of one league. fit() is a no-op until the league's
+# data version changes and then warm-starts from the previous coefficients,
+# so a refit after a few new results takes a handful of iterations.
+class MatchModel:
+    def __init__(self, teams):
+        self.teams = pd.Index(teams)
+        self.version = 0
+        self.rho = 0.0
+        self.regressor = linear_model.PoissonRegressor(alpha=PREDICTION_L2, warm_start=True, max_iter=300)
+        self.lock = threading.Lock()
+        self.predictions = {}
+    
+    # One row per team per match: [attack of scorer | defence of opponent | home]
+    def design(self, home, away):
+        n = len(self.teams)
+        m = len(home)
+        rows = np.repeat(np.arange(2 * m), 3)
+        scorer = np.column_stack([home, away]).ravel()
+        opponent = np.column_stack([away, home]).ravel()
+        is_home = np.tile([1.0, 0.0], m)
+        cols = np.column_stack([scorer, n + opponent, np.full(2 * m, 2 * n)]).ravel()
+        vals = np.column_stack([np.ones(2 * m), np.ones(2 * m), is_home]).ravel()
+        return sparse.csr_matrix((vals, (rows, cols)), shape=(2 * m, 2 * n + 1))
+    
+    # Expected (home, away) goals for arrays of team codes
+    def rates(self, home, away):
+        rates = self.regressor.predict(self.design(home, away))
+        return rates[0::2], rates[1::2]
+    
+    def fit(self, data):
+        with self.lock:
+            if data.version == self.version:
+                return False
+            started = time.perf_counter()
+            results = data.results
+            home = team_codes(results["home"], self.teams)
+            away = team_codes(results["away"], self.teams)
+            known = (home >= 0) & (away >= 0)
+            home, away = home[known], away[known]
+            home_goals = results["home_goals"].to_numpy()[known]
+            away_goals = results["away_goals"].to_numpy()[known]
+            dates = results["date"].to_numpy()[known]
+            age_days = (dates.max() - dates) / np.timedelta64(1, "D")
+            weights = 0.5 ** (age_days / PREDICTION_HALF_LIFE_DAYS)
+            
+            self.regressor.fit(
+                self.design(home, away),
+                np.column_stack([home_goals, away_goals]).ravel(),
+                sample_weight=np.repeat(weights, 2)
+            )
+            
+            # rho by weighted likelihood over a grid, on 0/1-goal matches only
+            low = (home_goals <= 1) & (away_goals <= 1)
+            home_rate, away_rate = self.rates(home[low], away[low])
+            tau = dixon_coles_tau(home_goals[low], away_goals[low], home_rate, away_rate, DIXON_COLES_RHO_GRID)
+            self.rho = float(DIXON_COLES_RHO_GRID[np.argmax(np.log(tau) @ weights[low])])
+            
+            self.version = data.version
+            self.predictions = {}
+            metrics = get_metrics()
+            metrics.incr("match_model.fits")
+            metrics.observe("match_model.fit_ms", round((time.perf_counter() - started) * 1000, 1))
+            metrics.observe("match_model.iterations", int(self.regressor.n_iter_))
+            return True
+    
+    # Scoreline probability matrices (fixtures x home goals x away goals) for
+    # every fixture at once
+    def scoreline_matrices(self, home, away):
+        home_rate, away_rate = self.rates(home, away)
+        goals = np.arange(PREDICTION_MAX_GOALS + 1)
+        log_factorial = np.concatenate([[0.0], np.cumsum(np.log(goals[1:]))])
+        home_pmf = np.exp(goals * np.log(home_rate)[:, None] - home_rate[:, None] - log_factorial)
+        away_pmf = np.exp(goals * np.log(away_rate)[:, None] - away_rate[:, None] - log_factorial)
+        matrices = home_pmf[:, :, None] * away_pmf[:, None, :]
+        rho = self.rho
+        matrices[:, 0, 0] *= 1 - home_rate * away_rate * rho
+        matrices[:, 0, 1] *= 1 + home_rate * rho
+        matrices[:, 1, 0] *= 1 + away_rate * rho
+        matrices[:, 1, 1] *= 1 - rho
+        matrices /= matrices.sum(axis=(1, 2), keepdims=True)
+        return matrices, home_rate, away_rate
+    
+    # Outcome probabilities, expected goals and most likely score per
+    # fixture, memoized until the next refit
+    def predict(self, fixtures):
+        key = tuple(zip(fixtures["home"].astype(str), fixtures["away"].astype(str)))
+        with self.lock:
+            cached = self.predictions.get(key)
+        if cached is not None:
+            return cached
+        
+        home = team_codes(fixtures["home"], self.teams)
+        away = team_codes(fixtures["away"], self.teams)
+        matrices, home_rate, away_rate = self.scoreline_matrices(home, away)
+        flat_best = matrices.reshape(len(matrices), -1).argmax(axis=1)
+        predictions = fixtures[["home", "away"]].astype(str).assign(
+            date=fixtures["date"].to_numpy(),
+            home_win=np.tril(np.ones(matrices.shape[1:]), -1).ravel() @ matrices.reshape(len(matrices), -1).T,
+            draw=np.trace(matrices, axis1=1, axis2=2),
+            away_win=np.triu(np.ones(matrices.shape[1:]), 1).ravel() @ matrices.reshape(len(matrices), -1).T,
+            home_xg=home_rate,
+            away_xg=away_rate,
+            home_score=flat_best // matrices.shape[2],
+            away_score=flat_best % matrices.shape[2]
+        ).reset_index(drop=True)
+        with self.lock:
+            self.predictions[key] = predictions
+        return predictions
+
+@st.cache_resource
+def get_match_models():
+    return {}
+
+# The league's fitted model, refitted (warm-started) when its results change
+def get_match_model(league):
+    models = get_match_models()
+    if league not in models:
+        models[league] = MatchModel(LEAGUE_TEAMS[league])
+    model = models[league]
+    model.fit(get_results_store().get(league))
+    return model
+
+# Monte Carlo season simulation: number of simulated seasons, split into
+# batches that run in parallel (NumPy releases the GIL for the heavy work)
+SEASON_SIMULATIONS = 100_000
+SEASON_SIMULATION_BATCH = 25_000
+TOP_PLACES = 4
+
+# Worker pool for CPU-bound analytics, kept apart from the I/O executor
+@st.cache_resource
+def get_simulation_executor():
+    return ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="scaistar-sim")
+
+# Simulate the remaining fixtures of one batch of seasons. Scorelines are
+# drawn from each fixture's cumulative scoreline distribution into a
+# (simulations x fixtures) array. Team totals are then matrix products with
+# the fixture -> team incidence matrices. Returns how often each team
+# finished first, in the top places and in the relegation places.
+def simulate_season_batch(cdf, home_teams, away_teams, base, tiebreakers, relegation, simulations, seed):
+    rng = np.random.default_rng(seed)
+    n = home_teams.shape[1]
+    width = PREDICTION_MAX_GOALS + 1
+    # Drawn fixture-major so each searchsorted reads contiguous memory
+    draws = rng.random((len(cdf), simulations))
+    outcomes = np.empty(draws.shape, dtype=np.int16)
+    for fixture in range(len(cdf)):
+        outcomes[fixture] = np.searchsorted(cdf[fixture], draws[fixture], side="right")
+    np.minimum(outcomes, width * width - 1, out=outcomes)
+    home_goals = (outcomes // width).T.astype(np.float32)
+    away_goals = (outcomes % width).T.astype(np.float32)
+    
+    home_won = (home_goals > away_goals).astype(np.float32)
+    away_won = (away_goals > home_goals).astype(np.float32)
+    drawn = (home_goals == away_goals).astype(np.float32)
+    totals = {
+        "points": (3 * home_won + drawn) @ home_teams + (3 * away_won + drawn) @ away_teams,
+        "goal_difference": (home_goals - away_goals) @ home_teams + (away_goals - home_goals) @ away_teams,
+        "goals_for": home_goals @ home_teams + away_goals @ away_teams,
+        "wins": home_won @ home_teams + away_won @ away_teams
+    }
+    
+    # One sortable key per team and season: points, then each tiebreaker the
+    # simulation can evaluate, then a random draw for anything still level
+    key = base["points"] + totals["points"].astype(np.int64)
+    for tiebreaker in tiebreakers:
+        if tiebreaker in totals:
+            key = key * 2048 + (base[tiebreaker] + totals[tiebreaker].astype(np.int64) + 1024)
+    order = np.argsort(-(key + rng.random(key.shape)), axis=1)
+    return (
+        np.bincount(order[:, 0], minlength=n),
+        np.bincount(order[:, :TOP_PLACES].ravel(), minlength=n),
+        np.bincount(order[:, n - relegation:].ravel(), minlength=n)
+    )
+
+# Title, top-four and relegation probabilities per team, from the current
+# table plus simulated remaining fixtures. Memoized per league and data
+# version, so it only reruns after a result changes.
+@st.cache_data(max_entries=16)
+def simulate_season(league, version, simulations=SEASON_SIMULATIONS):
+    started = time.perf_counter()
+    data = get_results_store().get(league)
+    teams = LEAGUE_TEAMS[league]
+    rules = LEAGUE_RULES[league]
+    season = SAMPLE_SEASONS[-1]
+    table = compute_standings(data.results[(data.results["season"] == season).to_numpy()], rules["tiebreakers"], teams)
+    table = table.set_index("Team").loc[teams]
+    base = {
+        "points": table["Points"].to_numpy(np.int64),
+        "goal_difference": table["GD"].to_numpy(np.int64),
+        "goals_for": table["GF"].to_numpy(np.int64),
+        "wins": table["Won"].to_numpy(np.int64)
+    }
+    
+    model = get_match_model(league)
+    fixtures = data.fixtures[(data.fixtures["season"] == season).to_numpy()]
+    names = pd.Index(teams)
+    home = team_codes(fixtures["home"], names)
+    away = team_codes(fixtures["away"], names)
+    matrices, _, _ = model.scoreline_matrices(home, away)
+    cdf = np.cumsum(matrices.reshape(len(matrices), -1), axis=1)
+    home_teams = np.eye(len(teams), dtype=np.float32)[home]
+    away_teams = np.eye(len(teams), dtype=np.float32)[away]
+    
+    seeds = np.random.SeedSequence(zlib.crc32(f"{league}:{version}".encode())).spawn(
+        math.ceil(simulations / SEASON_SIMULATION_BATCH))
+    batches = [
+        get_simulation_executor().submit(
+            simulate_season_batch, cdf, home_teams, away_teams, base, rules["tiebreakers"], rules["relegation"],
+            min(SEASON_SIMULATION_BATCH, simulations - i * SEASON_SIMULATION_BATCH), seed
+        )
+        for i, seed in enumerate(seeds)
+    ]
+    title, top, relegated = (sum(counts) for counts in zip(*(batch.result() for batch in batches)))
+    get_metrics().observe("season_sim.ms", round((time.perf_counter() - started) * 1000, 1))
+    return pd.DataFrame({
+        "Team": teams,
+        "Points": base["points"],
+        "Title": title / simulations,
+        f"Top {TOP_PLACES}": top / simulations,
+        "Relegation": relegated / simulations
+    }).sort_values(["Title", f"Top {TOP_PLACES}", "Points"], ascending=False, ignore_index=True)
+
+# Shot xG model: logistic in distance (metres), shooting angle (radians of
+# goal mouth visible) and headers; penalties have a fixed value
+XG_COEFFICIENTS = {"intercept": -1.45, "distance": -0.11, "angle": 1.3, "header": -0.9}
+PENALTY_XG = 0.76
+
+# Expected goals of every shot at once
+def shot_xg(shots):
+    logit = (
+        XG_COEFFICIENTS["intercept"]
+        + XG_COEFFICIENTS["distance"] * shots["distance"].to_numpy()
+        + XG_COEFFICIENTS["angle"] * shots["angle"].to_numpy()
+        + XG_COEFFICIENTS["header"] * (shots["body_part"] == "Head").to_numpy()
+    )
+    return np.where((shots["situation"] == "Penalty").to_numpy(), PENALTY_XG, 1 / (1 + np.exp(-logit)))
+
+# Seeded sample shot log for a league's results until real event data is
+# wired in: shots per team and match, their locations, and which of them
+# were the goals of the final score (picked by xG with the Gumbel top-k
+# trick, so the log always agrees with the results)
+def sample_shot_events(league, results):
+    rng = np.random.default_rng(zlib.crc32(f"shots:{league}".encode()))
+    m = len(results)
+    match_ids = np.repeat(np.arange(m), 2)
+    teams = np.column_stack([results["home"].astype(str), results["away"].astype(str)]).ravel()
+    goals = np.column_stack([results["home_goals"], results["away_goals"]]).ravel()
+    counts = goals + rng.poisson(10, 2 * m)
+    
+    owner = np.repeat(np.arange(2 * m), counts)
+    total = len(owner)
+    distance = np.clip(rng.gamma(3.0, 5.5, total), 2, 40)
+    angle = np.clip(np.arctan2(7.32 * distance, distance ** 2 - 7.32 ** 2 / 4 + 1) * rng.uniform(0.5, 1.0, total), 0.05, 1.6)
+    header = (rng.random(total) < 0.15) & (distance < 14)
+    penalty = rng.random(total) < 0.015
+    shirts = np.array([9, 10, 11, 7, 8, 17, 19, 4, 5, 6])
+    shirt = rng.choice(len(shirts), total, p=[0.24, 0.18, 0.14, 0.13, 0.1, 0.06, 0.05, 0.04, 0.03, 0.03])
+    team_names, shooter_teams = np.unique(teams[owner], return_inverse=True)
+    shots = pd.DataFrame({
+        "match": results.index.to_numpy()[match_ids[owner]],
+        "season": results["season"].to_numpy()[match_ids[owner]],
+        "minute": rng.integers(1, 96, total),
+        "team": teams[owner],
+        "player": pd.Categorical.from_codes(
+            shooter_teams * len(shirts) + shirt,
+            [f"{team} #{number}" for team in team_names for number in shirts]
+        ),
+        "distance": np.where(penalty, 11.0, distance).round(1),
+        "angle": np.where(penalty, 0.58, angle).round(3),
+        "body_part": np.where(header & ~penalty, "Head", "Foot"),
+        "situation": np.where(penalty, "Penalty", np.where(rng.random(total) < 0.25, "Set piece", "Open play"))
+    })
+    
+    key = np.log(shot_xg(shots)) - np.log(-np.log(rng.random(total)))
+    order = np.lexsort((-key, owner))
+    rank = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    is_goal = np.empty(total, dtype=bool)
+    is_goal[order] = rank < goals[owner[order]]
+    shots["is_goal"] = is_goal
+    for column in ["team", "player", "body_part", "situation", "season"]:
+        shots[column] = shots[column].astype("category")
+    return shots
+
+# Shot log of a league with xG per shot, memoized per data version
+@st.cache_data(max_entries=8)
+def league_shots(league, version):
+    data = get_results_store().get(league)
+    shots = sample_shot_events(league, data.results)
+    shots["xg"] = shot_xg(shots)
+    return shots
+
+# Goals vs xG aggregated by team, player and match with group-bys, memoized
+# per league, data version and season
+@st.cache_data(max_entries=32)
+def league_xg(league, version, season):
+    shots = league_shots(league, version)
+    shots = shots[(shots["season"] == season).to_numpy()]
+    
+    def aggregate(keys):
+        groups = shots.groupby(keys, observed=True)
+        table = pd.DataFrame({
+            "Shots": groups.size(), "Goals": groups["is_goal"].sum(), "xG": groups["xg"].sum()
+        }).reset_index()
+        table["Difference"] = table["Goals"] - table["xG"]
+        return table
+    
+    return {
+        "team": aggregate("team").rename(columns={"team": "Team"}),
+        "player": aggregate(["player", "team"]).rename(columns={"player": "Player", "team": "Team"}),
+        "match": aggregate(["match", "team"])
+    }
+
+# Green for over-performing xG, red for under-performing, one call per column
+def color_difference(values):
+    return np.select(
+        [values > 0, values < 0],
+        ["background-color: #d4edda; color: #155724", "background-color: #f8d7da; color: #721c24"],
+        ""
+    )
+
 # Create header with logo
 def create_header():
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -442,12 +3269,12 @@ def create_sidebar():
         """)
 
 # Home tab content
-def display_home():
+def display_home(clients):
     st.markdown("""
     <div class="card">
         <h2>👋 Welcome to SCAISTAR!</h2>
         <p>Your all-in-one platform for football insights, stats, and analysis powered by artificial intelligence.</p>
-        <p>Navigate through the tabs above to explore different features:</p>
+        <p>Use the navigation menu to explore different features:</p>
         <ul>
             <li><strong>Chat Assistant</strong>: Ask any football-related question</li>
             <li><strong>Live Matches</strong>: View real-time scores and match details</li>
@@ -536,17 +3363,12 @@ def display_home():
         
         st.markdown('<div class="card">', unsafe_allow_html=True)
         st.subheader("💡 Ask SCAISTAR")
-        quick_questions = [
-            "Who's likely to win the Premier League this season?",
-            "Which player has the most goals in Champions League?",
-            "Show me the best young talents to watch",
-            "Analyze Arsenal's defensive performance"
-        ]
-        
-        for q in quick_questions:
+        prewarm_answers(clients)
+        for q in QUICK_QUESTIONS:
             if st.button(q):
                 st.session_state.question = q
                 st.session_state.tab = "Chat"
+                st.rerun()
         
         st.markdown("</div>", unsafe_allow_html=True)
 
@@ -560,11 +3382,15 @@ def display_chat(clients):
     # Chat history initialization
     if "messages" not in st.session_state:
         st.session_state.messages = []
+    if "chat_memory" not in st.session_state:
+        st.session_state.chat_memory = ConversationMemory()
     
     # Display chat history
     for message in st.session_state.messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
+            if message.get("prompt_info"):
+                st.caption(message["prompt_info"])
     
     # Handle pre-filled question from quick questions
     if "question" in st.session_state:
@@ -575,6 +3401,9 @@ def display_chat(clients):
         prompt = st.chat_input("Ask me about football/soccer...")
     
     if prompt:
+        history = list(st.session_state.messages)
+        previous = [m["content"] for m in history if m["role"] == "user"][-1:]
+        
         # Add user message to chat
         st.session_state.messages.append({"role": "user", "content": prompt})
         with st.chat_message("user"):
@@ -584,20 +3413,92 @@ def display_chat(clients):
         with st.chat_message("assistant"):
             message_placeholder = st.empty()
             with st.spinner("Analyzing football data..."):
-                # Get context data for AI response
-                context = {
-                    "live_matches": fetch_data_from_sofascore(clients["sofascore_url"]),
-                    "sports_news": fetch_sports_news(clients["news_api_url"], clients["news_api_params"]).get("articles", [])[:5]
-                }
+                # Get context data for AI response, fetching all sources at once
+                offline = is_offline_mode()
+                context, context_report = gather_context({
+                    "live_matches": lambda: fetch_data_from_sofascore(clients["sofascore_url"], offline),
+                    "sports_news": lambda: fetch_sports_news(clients["news_api_url"], clients["news_api_params"], offline).get("articles", [])
+                })
+                # Retrieve for the previous question too, so follow-ups
+                # ("and their next match?") find the same teams
+                context = select_relevant_context(" ".join(previous + [prompt]), context)
                 
-                # Generate AI response
-                response = get_ai_response(clients["openai_client"], prompt, context)
+                # Earlier turns, folded into the summary once they age out
+                client = get_openai_client(clients["openai_api_key"])
+                memory = st.session_state.chat_memory
+                summary, recent = memory.window(history)
+            
+            # Compact, token-budgeted prompt
+            context_text, context_stats = build_compact_context(context)
+            messages = build_ai_messages(prompt, context_text, summary, recent)
+            prompt_tokens = estimate_prompt_tokens(messages)
+            history_tokens = estimate_tokens(summary) + sum(message_tokens(m) for m in recent)
+            metrics = get_metrics()
+            answer_cache = get_answer_cache()
+            snapshot = context_stats["snapshot"]
+            # Answers to follow-ups depend on the conversation, so only the
+            # first question of a chat is shared through the answer cache
+            response = None if history else answer_cache.get(prompt, snapshot)
+            
+            if response is not None:
+                st.session_state.messages.append({"role": "assistant", "content": response})
+                source = "cached answer"
+            else:
+                metrics.observe("llm.prompt_tokens", prompt_tokens)
+                metrics.observe("llm.history_tokens", history_tokens)
+                source = f"prompt ≈ {prompt_tokens} tokens"
+                if history:
+                    source += (
+                        f" (history ≈ {history_tokens}: {len(recent)} recent messages"
+                        f"{' + summary' if summary else ''})"
+                    )
                 
-                # Display response
-                message_placeholder.markdown(response)
-        
-        # Add assistant response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": response})
+                # Stream the AI response into the placeholder as tokens arrive
+                message_placeholder.markdown("▌")
+                response = ""
+                completed = False
+                started = time.perf_counter()
+                deltas = stream_ai_response(client, messages)
+                try:
+                    for delta in deltas:
+                        if not response:
+                            metrics.observe("llm.ttft_ms", round((time.perf_counter() - started) * 1000, 1))
+                        response += delta
+                        message_placeholder.markdown(response + "▌")
+                    metrics.observe("llm.response_ms", round((time.perf_counter() - started) * 1000, 1))
+                    completed = True
+                except LLMSaturated as e:
+                    response = f"SCAISTAR is answering a lot of questions right now ({e}). Please try again in a moment."
+                except Exception as e:
+                    metrics.incr("llm.stream_errors")
+                    error = f"Error generating response: {e}"
+                    response = f"{response}\n\n*{error}*" if response else error
+                finally:
+                    # Also runs when a rerun interrupts the stream: close the
+                    # upstream request and keep whatever text already arrived
+                    deltas.close()
+                    if response:
+                        # Add assistant response to chat history
+                        st.session_state.messages.append(
+                            {"role": "assistant", "content": response, "prompt_info": source}
+                        )
+                    if completed and response and not history:
+                        answer_cache.put(prompt, snapshot, response)
+            
+            # Fold aged-out turns now that the answer is shown, so the next
+            # question reads the summary instead of waiting for it
+            session = current_session_id()
+            memory.fold_later(
+                st.session_state.messages,
+                lambda summary, turns: summarize_conversation(client, summary, turns, session)
+            )
+            
+            # Display response
+            message_placeholder.markdown(response)
+            st.caption(
+                f"{format_context_report(context_report)} · {source} "
+                f"({context_stats['events']} matches, {context_stats['articles']} articles)"
+            )
 
 # Live matches tab content
 def display_live_matches(clients):
@@ -608,82 +3509,107 @@ def display_live_matches(clients):
     
     # Fetch live match data
     with st.spinner("Fetching live match data..."):
-        live_data = fetch_data_from_sofascore(clients["sofascore_url"])
+        live_data = fetch_data_from_sofascore(clients["sofascore_url"], is_offline_mode())
     
-    # Sample data for demonstration (would use real API data in production)
-    sample_matches = [
-        {
-            "home_team": "Arsenal FC",
-            "away_team": "Manchester City",
-            "home_score": 2,
-            "away_score": 2,
-            "time": "Live - 78'",
-            "league": "Premier League"
-        },
-        {
-            "home_team": "Barcelona",
-            "away_team": "Real Madrid",
-            "home_score": 1,
-            "away_score": 1,
-            "time": "Live - 62'",
-            "league": "La Liga"
-        },
-        {
-            "home_team": "Bayern Munich",
-            "away_team": "Borussia Dortmund",
-            "home_score": 3,
-            "away_score": 1,
-            "time": "Live - 81'",
-            "league": "Bundesliga"
-        },
-        {
-            "home_team": "Liverpool",
-            "away_team": "Manchester United",
-            "home_score": 2,
-            "away_score": 0,
-            "time": "HT",
-            "league": "Premier League"
-        }
-    ]
+    # Goal alerts for score changes since this session last saw the feed
+    poller = get_live_poller(clients["sofascore_url"])
+    last_seen = st.session_state.get("live_seen_version")
+    if last_seen is not None:
+        for delta in poller.deltas_since(last_seen):
+            for event in delta.scored:
+                st.toast(
+                    f"⚽ {event.get('homeTeam', {}).get('name')} "
+                    f"{event.get('homeScore', {}).get('current', 0)}-{event.get('awayScore', {}).get('current', 0)} "
+                    f"{event.get('awayTeam', {}).get('name')}"
+                )
+    st.session_state.live_seen_version = poller.latest().version
+    
+    # Columnar table built by the poller once per refresh; offline mode and
+    # an empty feed fall back to building one here
+    snapshot = poller.latest()
+    if live_data is snapshot.payload:
+        matches = snapshot.table
+    else:
+        matches = build_live_table(live_data.get("events", ()))
+    
+    if matches.empty:
+        # Sample data for demonstration (would use real API data in production)
+        kickoff = time.time() - 80 * 60
+        matches = live_table_from_rows([
+            (1, "Arsenal FC", "Manchester City", 2, 2, "Premier League", "Live", "Live - 78'", kickoff),
+            (2, "Barcelona", "Real Madrid", 1, 1, "La Liga", "Live", "Live - 62'", kickoff),
+            (3, "Bayern Munich", "Borussia Dortmund", 3, 1, "Bundesliga", "Live", "Live - 81'", kickoff),
+            (4, "Liverpool", "Manchester United", 2, 0, "Premier League", "Live", "HT", kickoff)
+        ])
     
     # Display filter options
+    leagues = ["Premier League", "La Liga", "Bundesliga", "Serie A", "Ligue 1"]
+    leagues += sorted(set(matches["league"].cat.categories) - set(leagues) - {""})
     col1, col2, col3 = st.columns(3)
     with col1:
-        league_filter = st.selectbox("Filter by League", 
-                                     ["All Leagues", "Premier League", "La Liga", "Bundesliga", "Serie A", "Ligue 1"])
+        league_filter = st.selectbox("Filter by League", ["All Leagues"] + leagues)
     with col2:
         status_filter = st.selectbox("Filter by Status", 
                                     ["All Statuses", "Live", "Not Started", "Finished"])
     with col3:
         team_filter = st.text_input("Search by Team")
     
+    # Filters and sub-tabs are boolean masks over the whole table
+    mask = np.ones(len(matches), dtype=bool)
+    if league_filter != "All Leagues":
+        mask &= (matches["league"] == league_filter).to_numpy()
+    if status_filter != "All Statuses":
+        mask &= (matches["status"] == status_filter).to_numpy()
+    if team_filter.strip():
+        team = team_filter.strip()
+        mask &= (
+            matches["home_team"].str.contains(team, case=False, regex=False).to_numpy(dtype=bool)
+            | matches["away_team"].str.contains(team, case=False, regex=False).to_numpy(dtype=bool)
+        )
+    
+    now = pd.Timestamp.now(tz="UTC")
+    today = now.normalize()
+    tab_masks = {
+        "Live Now": (matches["status"] == "Live").to_numpy(),
+        "Today": ((matches["start"] >= today) & (matches["start"] < today + pd.Timedelta(days=1))).to_numpy(),
+        "Upcoming": ((matches["status"] == "Not Started") & (matches["start"] >= now)).to_numpy(),
+        "Finished": (matches["status"] == "Finished").to_numpy()
+    }
+    
     # Create tabs for different match categories
-    match_tabs = st.tabs(["Live Now", "Today", "Upcoming", "Finished"])
+    match_tabs = st.tabs(list(tab_masks))
     
-    with match_tabs[0]:
-        for match in sample_matches:
-            st.markdown(f"""
-            <div class='match-card'>
-                <div class='team'>
-                    <img src='https://img.icons8.com/color/48/000000/football-team.png' class='team-logo'>
-                    <p>{match['home_team']}</p>
-                </div>
-                <div class='score'>
-                    <span class='status-badge'>{match['time']}</span>
-                    <p>{match['home_score']} - {match['away_score']}</p>
-                    <small>{match['league']}</small>
-                </div>
-                <div class='team'>
-                    <img src='https://img.icons8.com/color/48/000000/football-team.png' class='team-logo'>
-                    <p>{match['away_team']}</p>
+    for match_tab, (tab_name, tab_mask) in zip(match_tabs, tab_masks.items()):
+        with match_tab:
+            tab_matches = matches[mask & tab_mask].sort_values(["league", "start"], kind="stable")
+            if tab_matches.empty:
+                st.info("No matches found for these filters.")
+                continue
+            if len(tab_matches) > LIVE_MAX_CARDS:
+                st.caption(f"Showing {LIVE_MAX_CARDS} of {len(tab_matches)} matches. Narrow the filters to see more.")
+            for match in tab_matches.head(LIVE_MAX_CARDS).to_dict("records"):
+                st.markdown(f"""
+                <div class='match-card'>
+                    <div class='team'>
+                        <img src='https://img.icons8.com/color/48/000000/football-team.png' class='team-logo'>
+                        <p>{match['home_team']}</p>
+                    </div>
+                    <div class='score'>
+                        <span class='status-badge'>{match['time']}</span>
+                        <p>{match['home_score']} - {match['away_score']}</p>
+                        <small>{match['league']}</small>
+                    </div>
+                    <div class='team'>
+                        <img src='https://img.icons8.com/color/48/000000/football-team.png' class='team-logo'>
+                        <p>{match['away_team']}</p>
+                    </div>
                 </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Add a button to view detailed match statistics
-            if st.button(f"View Stats: {match['home_team']} vs {match['away_team']}"):
-                st.session_state['selected_match'] = match
-                st.session_state['show_match_details'] = True
+                """, unsafe_allow_html=True)
+                
+                # Add a button to view detailed match statistics
+                if st.button(f"View Stats: {match['home_team']} vs {match['away_team']}", key=f"stats_{tab_name}_{match['id']}"):
+                    st.session_state['selected_match'] = match
+                    st.session_state['show_match_details'] = True
     
     # Display match details if a match is selected
     if st.session_state.get('show_match_details', False):
@@ -719,7 +3645,7 @@ def display_live_matches(clients):
             # Display match statistics chart
             st.markdown('<div class="card">', unsafe_allow_html=True)
             st.subheader("Match Statistics")
-            fig = create_match_stats_chart(match['home_team'], match['away_team'])
+            fig = cached_figure(create_match_stats_chart, match['home_team'], match['away_team'])
             st.plotly_chart(fig, use_container_width=True)
             st.markdown("</div>", unsafe_allow_html=True)
             
@@ -765,32 +3691,7 @@ def display_players(clients):
     # If search button is clicked or player name is entered
     if search_button or player_search:
         with st.spinner("Searching for player..."):
-            # Prepare for API call (in real implementation)
-            headers = {"X-RapidAPI-Key": clients["rapidapi_key"]}
-            params = {"search": player_search}
-            
-            # For demonstration, use sample data
-            sample_players = [
-                {
-                    "name": "Lionel Messi",
-                    "age": 35,
-                    "team": "Inter Miami CF",
-                    "position": "Forward",
-                    "nationality": "Argentina",
-                    "image": "https://img.icons8.com/color/96/000000/messi.png"
-                },
-                {
-                    "name": "Cristiano Ronaldo",
-                    "age": 38,
-                    "team": "Al-Nassr FC",
-                    "position": "Forward",
-                    "nationality": "Portugal",
-                    "image": "https://img.icons8.com/color/96/000000/cristiano-ronaldo.png"
-                }
-            ]
-            
-            # Filter sample data based on search
-            filtered_players = [p for p in sample_players if player_search.lower() in p["name"].lower()]
+            filtered_players = search_players(clients, player_search)
             
             if filtered_players:
                 for player in filtered_players:
@@ -807,7 +3708,9 @@ def display_players(clients):
                     </div>
                     """, unsafe_allow_html=True)
                     
-                    if st.button(f"View detailed stats for {player['name']}"):
+                    # Names aren't unique across teams: key on the index identity
+                    player_key = player.get("id") or f"{player['name']}|{player['team']}"
+                    if st.button(f"View detailed stats for {player['name']}", key=f"player_detail_{player_key}"):
                         st.session_state['selected_player'] = player
                         st.session_state['show_player_details'] = True
             else:
@@ -824,7 +3727,7 @@ def display_players(clients):
         player2 = st.selectbox("Select second player", ["Cristiano Ronaldo", "Lionel Messi", "Kylian Mbappé", "Erling Haaland"])
     
     if st.button("Compare Players"):
-        fig = create_player_comparison(player1, player2)
+        fig = cached_figure(create_player_comparison, player1, player2)
         st.plotly_chart(fig, use_container_width=True)
     st.markdown("</div>", unsafe_allow_html=True)
     
@@ -869,26 +3772,7 @@ def display_players(clients):
                 attributes = ["Pace", "Shooting", "Passing", "Dribbling", "Defending", "Physical"]
                 values = [95, 97, 98, 99, 40, 68]
                 
-                fig = go.Figure()
-                
-                fig.add_trace(go.Scatterpolar(
-                    r=values,
-                    theta=attributes,
-                    fill='toself',
-                    name=player['name'],
-                    line_color='#3366ff'
-                ))
-                
-                fig.update_layout(
-                    polar=dict(
-                        radialaxis=dict(
-                            visible=True,
-                            range=[0, 100]
-                        )
-                    ),
-                    showlegend=False,
-                    title="Player Attributes"
-                )
+                fig = cached_figure(create_attribute_radar, player['name'], attributes, values)
                 
                 st.plotly_chart(fig, use_container_width=True)
                 
@@ -914,35 +3798,7 @@ def display_players(clients):
             goals = [match["goals"] for match in matches]
             assists = [match["assists"] for match in matches]
             
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=match_nums,
-                y=goals,
-                mode='lines+markers',
-                name='Goals',
-                line=dict(color='#3366ff', width=3),
-                marker=dict(size=10)
-            ))
-            fig.add_trace(go.Scatter(
-                x=match_nums,
-                y=assists,
-                mode='lines+markers',
-                name='Assists',
-                line=dict(color='#ff3366', width=3),
-                marker=dict(size=10)
-            ))
-            fig.update_layout(
-                title="Performance in Last 5 Matches",
-                xaxis_title="Match Number",
-                yaxis_title="Count",
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                )
-            )
+            fig = cached_figure(create_recent_matches_chart, match_nums, goals, assists)
             
             st.plotly_chart(fig, use_container_width=True)
         
@@ -965,26 +3821,7 @@ def display_players(clients):
             goals = [c["goals"] for c in career]
             assists = [c["assists"] for c in career]
             
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=seasons,
-                y=goals,
-                name='Goals',
-                marker_color='#3366ff'
-            ))
-            fig.add_trace(go.Bar(
-                x=seasons,
-                y=assists,
-                name='Assists',
-                marker_color='#ff3366'
-            ))
-            fig.update_layout(
-                title="Goals and Assists by Season",
-                xaxis_title="Season",
-                yaxis_title="Count",
-                barmode='group',
-                xaxis={'categoryorder':'array', 'categoryarray':seasons[::-1]}
-            )
+            fig = cached_figure(create_career_chart, seasons, goals, assists)
             
             st.plotly_chart(fig, use_container_width=True)
 
@@ -996,67 +3833,46 @@ def display_news(clients):
     st.markdown("</div>", unsafe_allow_html=True)
     
     with st.spinner("Fetching latest news..."):
-        news_data = fetch_sports_news(clients["news_api_url"], clients["news_api_params"])
-    
-    sample_news = [
-        {
-            "title": "Premier League announces new broadcast deal",
-            "description": "The Premier League has announced a record-breaking new broadcast deal worth £5 billion for the next three seasons.",
-            "source": {"name": "BBC Sport"},
-            "publishedAt": "2024-04-10T10:30:00Z",
-            "urlToImage": "https://via.placeholder.com/300x200?text=Premier+League"
-        },
-        {
-            "title": "Champions League quarter-finals set to begin",
-            "description": "Eight teams remain in the hunt for European glory as the Champions League quarter-finals kick off this week.",
-            "source": {"name": "Sky Sports"},
-            "publishedAt": "2024-04-09T15:45:00Z",
-            "urlToImage": "https://via.placeholder.com/300x200?text=Champions+League"
-        },
-        {
-            "title": "Messi scores hat-trick in Inter Miami's victory",
-            "description": "Lionel Messi continued his exceptional form with a hat-trick in Inter Miami's 5-0 win in the MLS.",
-            "source": {"name": "ESPN"},
-            "publishedAt": "2024-04-08T08:20:00Z",
-            "urlToImage": "https://via.placeholder.com/300x200?text=Messi"
-        },
-        {
-            "title": "England announce squad for upcoming internationals",
-            "description": "Gareth Southgate has named his England squad for the upcoming international fixtures, with several surprise inclusions.",
-            "source": {"name": "The Guardian"},
-            "publishedAt": "2024-04-07T13:10:00Z",
-            "urlToImage": "https://via.placeholder.com/300x200?text=England"
-        },
-        {
-            "title": "Juventus sack manager after poor run of results",
-            "description": "Juventus have parted ways with their manager following a disappointing run of results in Serie A.",
-            "source": {"name": "Goal.com"},
-            "publishedAt": "2024-04-06T09:40:00Z",
-            "urlToImage": "https://via.placeholder.com/300x200?text=Juventus"
-        }
-    ]
+        news_data = fetch_sports_news(clients["news_api_url"], clients["news_api_params"], is_offline_mode())
+    
+    
+    articles = news_data.get("articles") or SAMPLE_NEWS
+    news = get_news_pipeline().process(articles)
+    if news_data.get("articles"):
+        get_trending_topics().add_articles(news_data["articles"])
     
     col1, col2 = st.columns(2)
     with col1:
         source_filter = st.selectbox("Filter by Source", 
-                                    ["All Sources", "BBC Sport", "Sky Sports", "ESPN", "The Guardian", "Goal.com"])
+                                    ["All Sources"] + sorted(news["source"].cat.categories))
     with col2:
         topic_filter = st.selectbox("Filter by Topic", 
-                                   ["All Topics", "Premier League", "Champions League", "International", "Transfers"])
+                                   ["All Topics"] + list(NEWS_TOPICS))
+    
+    mask = np.ones(len(news), dtype=bool)
+    if source_filter != "All Sources":
+        mask &= (news["source"] == source_filter).to_numpy()
+    if topic_filter != "All Topics":
+        mask &= news[f"topic:{topic_filter}"].to_numpy()
     
-    for i, news in enumerate(sample_news):
+    if not mask.any():
+        st.info("No articles match these filters.")
+    
+    for article in news[mask].to_dict("records"):
+        published = article["published"].strftime("%Y-%m-%d") if pd.notna(article["published"]) else ""
+        also_in = f" · also in {', '.join(article['also_in'])}" if article["also_in"] else ""
         st.markdown(f"""
         <div class="news-card">
             <div style="display: flex; gap: 20px;">
                 <div style="flex: 1;">
-                    <img src="{news['urlToImage']}" style="width: 100%; border-radius: 5px;">
+                    <img src="{article['image']}" style="width: 100%; border-radius: 5px;">
                 </div>
                 <div style="flex: 3;">
-                    <h3>{news['title']}</h3>
-                    <p>{news['description']}</p>
+                    <h3>{article['title']}</h3>
+                    <p>{article['description']}</p>
                     <div style="display: flex; justify-content: space-between; margin-top: 10px;">
-                        <span style="color: #666;">{news['source']['name']}</span>
-                        <span style="color: #666;">{news['publishedAt'].split('T')[0]}</span>
+                        <span style="color: #666;">{article['source']}{also_in}</span>
+                        <span style="color: #666;">{published}</span>
                     </div>
                 </div>
             </div>
@@ -1065,7 +3881,9 @@ def display_news(clients):
     
     st.markdown('<div class="card">', unsafe_allow_html=True)
     st.subheader("Trending Topics")
-    topics = ["#ChampionsLeague", "#PremierLeague", "#Messi", "#Ronaldo", "#TransferNews"]
+    topics = [hashtag(term) for term in get_trending_topics().top(5)]
+    if not topics:
+        topics = ["#ChampionsLeague", "#PremierLeague", "#Messi", "#Ronaldo", "#TransferNews"]
     st.markdown(
         '<div style="display: flex; gap: 10px; flex-wrap: wrap;">'+
         ''.join([f'<div style="background-color: #e6f3ff; padding: 8px 15px; border-radius: 20px;">{topic}</div>' for topic in topics])+
@@ -1084,11 +3902,14 @@ def display_analytics():
     analytics_tabs = st.tabs(["League Tables", "Team Analysis", "Predictions", "Advanced Stats"])
     
     with analytics_tabs[0]:
-        league_selector = st.selectbox("Select League", 
-                                      ["Premier League", "La Liga", "Bundesliga", "Serie A", "Ligue 1"])
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            league_selector = st.selectbox("Select League", list(LEAGUE_TEAMS))
+        with col2:
+            season_selector = st.selectbox("Season", SAMPLE_SEASONS[::-1])
         
         st.subheader(f"{league_selector} Standings")
-        standings_df = create_league_standings()
+        standings_df = create_league_standings(league_selector, season_selector)
         st.dataframe(standings_df, hide_index=True)
         
         st.subheader("League Statistics")
@@ -1102,10 +3923,7 @@ def display_analytics():
                 "Goals": [27, 24, 21, 19, 18]
             }
             scorers_df = pd.DataFrame(top_scorers)
-            fig = px.bar(scorers_df, x="Player", y="Goals", 
-                        text="Goals", color="Team", 
-                        title="Top Goal Scorers")
-            fig.update_layout(xaxis_title="", yaxis_title="Goals Scored")
+            fig = cached_figure(create_leaderboard_chart, scorers_df, "Goals", "Top Goal Scorers", "Goals Scored")
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
@@ -1116,18 +3934,15 @@ def display_analytics():
                 "Assists": [18, 15, 14, 14, 12]
             }
             assists_df = pd.DataFrame(top_assists)
-            fig = px.bar(assists_df, x="Player", y="Assists", 
-                        text="Assists", color="Team", 
-                        title="Top Assists Providers")
-            fig.update_layout(xaxis_title="", yaxis_title="Assists Made")
+            fig = cached_figure(create_leaderboard_chart, assists_df, "Assists", "Top Assists Providers", "Assists Made")
             st.plotly_chart(fig, use_container_width=True)
     
     with analytics_tabs[1]:
         team_selector = st.selectbox("Select Team", 
                                     ["Arsenal", "Manchester City", "Liverpool", "Barcelona", "Real Madrid"])
         st.subheader(f"{team_selector} - Team Analysis")
-        st.markdown("#### Form in Last 10 Matches")
-        form_chart = create_team_form_chart(team_selector)
+        form_window = st.radio("Form", list(FORM_WINDOWS), horizontal=True)
+        form_chart = cached_figure(create_team_form_chart, team_selector, team_form(team_selector, FORM_WINDOWS[form_window]))
         st.plotly_chart(form_chart, use_container_width=True)
         col1, col2 = st.columns(2)
         
@@ -1182,106 +3997,80 @@ def display_analytics():
     
     with analytics_tabs[2]:
         st.markdown("#### Match Outcome Predictions")
-        upcoming_matches = [
-            {"home": "Arsenal", "away": "Liverpool", "competition": "Premier League", "date": "2024-04-15"},
-            {"home": "Barcelona", "away": "Real Madrid", "competition": "La Liga", "date": "2024-04-21"},
-            {"home": "Bayern Munich", "away": "Borussia Dortmund", "competition": "Bundesliga", "date": "2024-04-18"}
-        ]
-        for match in upcoming_matches:
+        prediction_league = st.selectbox("Competition", list(LEAGUE_TEAMS), key="prediction_league")
+        fixtures = get_results_store().get(prediction_league).fixtures
+        next_round = fixtures[fixtures["round"] == fixtures["round"].min()]
+        predictions = get_match_model(prediction_league).predict(next_round) if len(next_round) else next_round
+        if not len(predictions):
+            st.info("No upcoming fixtures.")
+        for match in predictions.to_dict("records"):
             st.markdown(f"""
             <div style="background-color: white; padding: 15px; border-radius: 5px; margin-bottom: 15px; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
-                <h5>{match['home']} vs {match['away']} - {match['competition']}</h5>
-                <p>Date: {match['date']}</p>
+                <h5>{match['home']} vs {match['away']} - {prediction_league}</h5>
+                <p>Date: {match['date']:%Y-%m-%d}</p>
                 <div style="display: flex; margin-top: 10px; gap: 10px;">
                     <div style="flex: 1; text-align: center; background-color: #e6f3ff; padding: 10px; border-radius: 5px;">
                         <h6>{match['home']} Win</h6>
-                        <p style="font-size: 24px; font-weight: bold;">45%</p>
+                        <p style="font-size: 24px; font-weight: bold;">{match['home_win']:.0%}</p>
                     </div>
                     <div style="flex: 1; text-align: center; background-color: #f0f0f0; padding: 10px; border-radius: 5px;">
                         <h6>Draw</h6>
-                        <p style="font-size: 24px; font-weight: bold;">30%</p>
+                        <p style="font-size: 24px; font-weight: bold;">{match['draw']:.0%}</p>
                     </div>
                     <div style="flex: 1; text-align: center; background-color: #ffe6e6; padding: 10px; border-radius: 5px;">
                         <h6>{match['away']} Win</h6>
-                        <p style="font-size: 24px; font-weight: bold;">25%</p>
+                        <p style="font-size: 24px; font-weight: bold;">{match['away_win']:.0%}</p>
                     </div>
                 </div>
                 <div style="margin-top: 15px;">
-                    <p><strong>Score Prediction:</strong> {match['home']} 2-1 {match['away']}</p>
-                    <p><strong>Key Factors:</strong> Home advantage, Recent form, Head-to-head record</p>
+                    <p><strong>Score Prediction:</strong> {match['home']} {match['home_score']}-{match['away_score']} {match['away']}</p>
+                    <p><strong>Expected Goals:</strong> {match['home_xg']:.2f} - {match['away_xg']:.2f}</p>
                 </div>
             </div>
             """, unsafe_allow_html=True)
         
         st.markdown("#### Season Outcome Predictions")
-        title_race = {
-            "Team": ["Manchester City", "Arsenal", "Liverpool", "Aston Villa", "Tottenham"],
-            "Probability": [45, 35, 15, 3, 2]
-        }
-        title_df = pd.DataFrame(title_race)
-        fig = px.pie(title_df, values="Probability", names="Team", 
-                    title="Premier League Title Race Probabilities",
-                    color_discrete_sequence=px.colors.sequential.Blues)
-        fig.update_traces(textposition='inside', textinfo='percent+label')
+        outlook = simulate_season(prediction_league, get_results_store().get(prediction_league).version)
+        title_df = outlook[outlook["Title"] >= 0.005].rename(columns={"Title": "Probability"})
+        fig = cached_figure(create_title_race_chart, title_df, prediction_league)
         st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(
+            outlook,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                column: st.column_config.NumberColumn(format="percent")
+                for column in ["Title", f"Top {TOP_PLACES}", "Relegation"]
+            }
+        )
+        st.caption(f"Based on {SEASON_SIMULATIONS:,} simulations of the remaining fixtures.")
     
     with analytics_tabs[3]:
         st.markdown("#### Expected Goals (xG) Analysis")
-        xg_data = {
-            "Team": ["Man City", "Arsenal", "Liverpool", "Man United", "Chelsea", 
-                    "Newcastle", "Tottenham", "Aston Villa", "Brighton", "West Ham"],
-            "Goals": [78, 75, 70, 60, 58, 55, 53, 48, 45, 42],
-            "xG": [82.3, 68.5, 72.1, 55.8, 61.2, 50.3, 57.5, 45.2, 42.8, 38.5]
-        }
-        xg_df = pd.DataFrame(xg_data)
-        xg_df["Difference"] = xg_df["Goals"] - xg_df["xG"]
-        xg_df = xg_df.sort_values("Difference", ascending=False)
+        xg_league = st.selectbox("League", list(LEAGUE_TEAMS), key="xg_league")
+        xg_tables = league_xg(xg_league, get_results_store().get(xg_league).version, SAMPLE_SEASONS[-1])
+        xg_df = xg_tables["team"].sort_values("Difference", ascending=False)
         
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=xg_df["Team"],
-            y=xg_df["Goals"],
-            name="Actual Goals",
-            marker_color='#3366ff'
-        ))
-        fig.add_trace(go.Bar(
-            x=xg_df["Team"],
-            y=xg_df["xG"],
-            name="Expected Goals (xG)",
-            marker_color='#ff3366'
-        ))
-        fig.update_layout(
-            title="Goals vs Expected Goals (xG) by Team",
-            xaxis_title="Team",
-            yaxis_title="Goals",
-            barmode='group',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
-        )
+        fig = cached_figure(create_xg_chart, xg_df)
         st.plotly_chart(fig, use_container_width=True)
         
         st.markdown("#### Over/Under Performance vs. Expected Goals")
-        xg_df["Difference"] = xg_df["Difference"].apply(lambda x: f"+{x:.1f}" if x > 0 else f"{x:.1f}")
-        
-        def color_difference(val):
-            try:
-                num = float(val.replace('+', '')) 
-                if num > 0:
-                    return 'background-color: #d4edda; color: #155724'
-                elif num < 0:
-                    return 'background-color: #f8d7da; color: #721c24'
-                else:
-                    return ''
-            except:
-                return ''
+        styled_df = (
+            xg_df[["Team", "Goals", "xG", "Difference"]].style
+            .apply(color_difference, subset=["Difference"])
+            .format({"xG": "{:.1f}", "Difference": "{:+.1f}"})
+        )
+        st.dataframe(styled_df, hide_index=True, use_container_width=True)
         
-        styled_df = xg_df.style.map(color_difference, subset=['Difference'])
-        st.dataframe(styled_df, use_container_width=True)
+        st.markdown("#### Top Players by xG")
+        players_df = xg_tables["player"].nlargest(10, "xG")
+        st.dataframe(
+            players_df.style
+            .apply(color_difference, subset=["Difference"])
+            .format({"xG": "{:.1f}", "Difference": "{:+.1f}"}),
+            hide_index=True,
+            use_container_width=True
+        )
         
         st.markdown("#### Progressive Passing & Carrying Analysis")
         progressive_data = {
@@ -1293,22 +4082,7 @@ def display_analytics():
                     "Man City", "Man Utd", "Man City", "Man City", "Man Utd"]
         }
         prog_df = pd.DataFrame(progressive_data)
-        fig = px.scatter(prog_df, x="Progressive Passes", y="Progressive Carries", 
-                         color="Team", size="Progressive Passes", 
-                         hover_name="Player", 
-                         title="Progressive Passing vs. Carrying by Player",
-                         color_discrete_sequence=px.colors.qualitative.Plotly)
-        fig.update_layout(
-            xaxis_title="Progressive Passes",
-            yaxis_title="Progressive Carries",
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
-        )
+        fig = cached_figure(create_progressive_chart, prog_df)
         st.plotly_chart(fig, use_container_width=True)
 
 # Settings tab content (Removed API key settings)
@@ -1361,7 +4135,26 @@ def display_settings():
     st.subheader("Data Preferences")
     st.slider("Chat History Retention (days)", 1, 30, 7)
     st.checkbox("Allow Analytics Collection", True, help="Helps us improve the application by collecting anonymous usage data")
-    st.checkbox("Enable Offline Mode (Save data for offline access)", False)
+    st.session_state.offline_mode = st.checkbox(
+        "Enable Offline Mode (Save data for offline access)",
+        is_offline_mode(),
+        help="Serve matches and news from the data saved on this server instead of the live APIs"
+    )
+    st.markdown("</div>", unsafe_allow_html=True)
+    
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    st.subheader("Performance")
+    metrics = get_metrics().summary()
+    if metrics:
+        st.dataframe(pd.DataFrame(metrics), hide_index=True, use_container_width=True)
+    else:
+        st.markdown("No metrics recorded yet.")
+    quotas = get_rate_limiters().status()
+    if quotas:
+        st.markdown("#### API Quotas")
+        st.dataframe(pd.DataFrame(quotas), hide_index=True, use_container_width=True)
+    st.markdown("#### AI Request Queue")
+    st.dataframe(pd.DataFrame([get_llm_limiter().status()]), hide_index=True, use_container_width=True)
     st.markdown("</div>", unsafe_allow_html=True)
     
     st.button("Save All Settings", type="primary")
@@ -1444,32 +4237,61 @@ def display_about():
     """)
     st.markdown("</div>", unsafe_allow_html=True)
 
+# Navigation table: page key, title, icon and the renderer that draws it.
+# Renderers that talk to the APIs receive the clients dict.
+PAGES = [
+    ("Home", "Home", "🏠", display_home, True),
+    ("Chat", "Chat Assistant", "💬", display_chat, True),
+    ("Live", "Live Matches", "🔴", display_live_matches, True),
+    ("Players", "Players", "🎮", display_players, True),
+    ("News", "News", "📰", display_news, True),
+    ("Analytics", "Analytics", "📈", display_analytics, False),
+    ("Settings", "Settings", "⚙️", display_settings, False),
+    ("About", "About", "ℹ️", display_about, False),
+]
+
+# Build one st.Page per entry. Unlike st.tabs, st.navigation only runs the
+# selected page, so a keystroke in the chat box no longer triggers the
+# SofaScore/NewsAPI fetches or the Analytics figures.
+def build_pages(clients):
+    pages = {}
+    for key, title, icon, renderer, needs_clients in PAGES:
+        if needs_clients:
+            run = (lambda renderer=renderer: renderer(clients))
+        else:
+            run = renderer
+        pages[key] = st.Page(
+            run,
+            title=title,
+            icon=icon,
+            url_path=key.lower(),
+            default=(key == "Home")
+        )
+    return pages
+
 # Main application
 def main():
     if "tab" not in st.session_state:
         st.session_state.tab = "Home"
+        st.session_state.active_tab = "Home"
     
     create_header()
     create_sidebar()
     clients = initialize_clients()
-    tabs = st.tabs(["🏠 Home", "💬 Chat Assistant", "🔴 Live Matches", "🎮 Players", "📰 News", "📈 Analytics", "⚙️ Settings", "ℹ️ About"])
-    
-    with tabs[0]:
-        display_home()
-    with tabs[1]:
-        display_chat(clients)
-    with tabs[2]:
-        display_live_matches(clients)
-    with tabs[3]:
-        display_players(clients)
-    with tabs[4]:
-        display_news(clients)
-    with tabs[5]:
-        display_analytics()
-    with tabs[6]:
-        display_settings()
-    with tabs[7]:
-        display_about()
+    pages = build_pages(clients)
+    page = st.navigation(list(pages.values()))
+    current = next(key for key, p in pages.items() if p is page)
+    
+    # A page (e.g. the Home quick questions) requested another page through
+    # st.session_state.tab; otherwise keep tab in sync with the sidebar.
+    if st.session_state.tab != st.session_state.active_tab:
+        st.session_state.active_tab = st.session_state.tab
+        if st.session_state.tab != current and st.session_state.tab in pages:
+            st.switch_page(pages[st.session_state.tab])
+    else:
+        st.session_state.tab = st.session_state.active_tab = current
+    
+    page.run()
 
 if __name__ == "__main__":
     main()
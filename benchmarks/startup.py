@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Cold-start benchmark for app.py. Every sample runs in a fresh interpreter:
+#   import_s - executing app.py's module level (imports, page config, CSS)
+#   render_s - time until the first full render of the default page,
+#              through Streamlit's AppTest (includes the imports)
+# Medians are appended to a history file, and the run fails when either
+# one regresses beyond the tolerance against the recent history of runs with
+# the same label (name the runner class, e.g. "ci-2vcpu"; hostnames change
+# on CI) or exceeds an absolute budget.
+#
+#   python benchmarks/startup.py                  # measure, compare, record
+#   python benchmarks/startup.py --no-record      # measure and compare only
+#   python benchmarks/startup.py --label ci-2vcpu --max-import 2 --max-render 4
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+HISTORY = os.path.join(ROOT, "benchmarks", "startup_history.jsonl")
+LABEL = os.environ.get("SCAISTAR_BENCHMARK_LABEL", "local")
+
+# Libraries only some pages need; reported when the default page pulls them in
+HEAVY_MODULES = ["pandas", "plotly.express", "sklearn", "scipy", "openai"]
+
+IMPORT_CHILD = """
+import importlib.util, json, os, sys, time
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location("scaistar_app", sys.argv[1])
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "modules": [m for m in json.loads(sys.argv[2]) if m in sys.modules]}))
+sys.stdout.flush()
+os._exit(0)
+"""
+
+RENDER_CHILD = """
+import json, os, sys, time
+from streamlit.testing.v1 import AppTest
+started = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+elapsed = time.perf_counter() - started
+errors = [e.value for e in at.exception]
+print(json.dumps({"seconds": elapsed, "errors": errors, "modules": [m for m in json.loads(sys.argv[2]) if m in sys.modules]}))
+sys.stdout.flush()
+os._exit(0)
+"""
+
+# Run one child interpreter and return its JSON report
+def run_child(code, env):
+    result = subprocess.run(
+        [sys.executable, "-c", code, APP, json.dumps(HEAVY_MODULES)],
+        capture_output=True, text=True, env=env, cwd=ROOT, timeout=300
+    )
+    lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    if result.returncode != 0 or not lines:
+        raise RuntimeError(f"benchmark child failed ({result.returncode}):\n{result.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+def measure(runs):
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-startup-benchmark")
+    imports, renders = [], []
+    loaded = set()
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(runs):
+            # A fresh persistent cache each time, like a new pod
+            env["SCAISTAR_CACHE_PATH"] = os.path.join(tmp, f"cache-{i}.sqlite3")
+            report = run_child(IMPORT_CHILD, env)
+            imports.append(report["seconds"])
+            report = run_child(RENDER_CHILD, env)
+            if report["errors"]:
+                raise RuntimeError(f"first render raised: {report['errors']}")
+            renders.append(report["seconds"])
+            loaded.update(report["modules"])
+    return {
+        "import_s": round(statistics.median(imports), 3),
+        "render_s": round(statistics.median(renders), 3),
+        "import_samples": [round(x, 3) for x in imports],
+        "render_samples": [round(x, 3) for x in renders],
+        "heavy_modules_on_first_render": sorted(loaded)
+    }
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Regressions of the current result against the median of the last
+# `window` passing entries recorded with the same label and Python
+def check(result, history, window, tolerance, slack):
+    comparable = [
+        entry for entry in history
+        if not entry.get("regression") and entry.get("label") == result["label"]
+        and entry.get("python") == result["python"]
+    ][-window:]
+    failures = []
+    if not comparable:
+        return failures, None
+    baseline = {}
+    for metric in ["import_s", "render_s"]:
+        baseline[metric] = statistics.median(entry[metric] for entry in comparable)
+        limit = baseline[metric] * (1 + tolerance) + slack
+        if result[metric] > limit:
+            failures.append(f"{metric} {result[metric]:.3f}s > {limit:.3f}s "
+                            f"(baseline {baseline[metric]:.3f}s over {len(comparable)} runs)")
+    return failures, baseline
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for app.py")
+    parser.add_argument("--runs", type=int, default=5, help="fresh-process samples per metric")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs. baseline (0.25 = 25%%)")
+    parser.add_argument("--slack", type=float, default=0.1, help="absolute seconds allowed on top of the tolerance")
+    parser.add_argument("--window", type=int, default=5, help="recent history entries forming the baseline")
+    parser.add_argument("--label", default=LABEL,
+                        help="baseline group, e.g. the CI runner class (default: $SCAISTAR_BENCHMARK_LABEL or 'local')")
+    parser.add_argument("--max-import", type=float, help="also fail when import_s exceeds this many seconds")
+    parser.add_argument("--max-render", type=float, help="also fail when render_s exceeds this many seconds")
+    parser.add_argument("--history", default=HISTORY, help="history file (JSON lines)")
+    parser.add_argument("--no-record", action="store_true", help="don't append this run to the history")
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    result.update({
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "label": args.label,
+        "machine": platform.node(),
+        "python": platform.python_version()
+    })
+    failures, baseline = check(result, load_history(args.history), args.window, args.tolerance, args.slack)
+    for metric, budget in [("import_s", args.max_import), ("render_s", args.max_render)]:
+        if budget is not None and result[metric] > budget:
+            failures.append(f"{metric} {result[metric]:.3f}s > budget {budget:.3f}s")
+    result["regression"] = bool(failures)
+
+    print(f"import: {result['import_s']:.3f}s  first render: {result['render_s']:.3f}s  "
+          f"(median of {args.runs})")
+    if result["heavy_modules_on_first_render"]:
+        print("heavy modules loaded by the first render:", ", ".join(result["heavy_modules_on_first_render"]))
+    if baseline:
+        print(f"baseline: import {baseline['import_s']:.3f}s  first render {baseline['render_s']:.3f}s")
+
+    if not args.no_record:
+        with open(args.history, "a") as f:
+            f.write(json.dumps(result) + "\n")
+
+    if failures:
+        print("Cold-start regression:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()